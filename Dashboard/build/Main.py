@@ -1,6 +1,53 @@
-from interface import interface
+import argparse
 
 # Exécuter l'interface graphique
 if __name__ == "__main__":
-    interface = interface()
-    interface.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Tableau de bord des accidents de route au Maroc")
+    parser.add_argument("--bitmaps", action="store_true",
+                        help="afficher les panneaux depuis un cache d'images, le graphique interactif au survol")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="afficher le temps des imports et des phases de démarrage")
+    parser.add_argument("--extract", metavar="FICHIER",
+                        help="extrait par accident (CSV ou Parquet) lu par morceaux à la place des feuilles agrégées")
+    parser.add_argument("--chunk-size", type=int, default=500_000,
+                        help="nombre de lignes de l'extrait lues à la fois")
+    parser.add_argument("--lean", action="store_true",
+                        help="garder les feuilles en types réduits (catégories, entiers 32 bits)")
+    parser.add_argument("--serve", type=int, nargs="?", const=8050, metavar="PORT",
+                        help="servir les graphiques et la carte en HTTP sur localhost, sans Tk")
+    parser.add_argument("--prewarm-map", action="store_true",
+                        help="lancer la carte ADM Trafic en arrière-plan peu après le démarrage")
+    parser.add_argument("--traffic", metavar="SOURCE",
+                        help="flux trafic affiché sur la carte : tcp://hôte:port, ws://... ou fichier .jsonl")
+    parser.add_argument("--perf", action="store_true",
+                        help="chronométrer les opérations (F10 : tableau p50/p95, F11 : profil cProfile)")
+    args = parser.parse_args()
+
+    if args.serve:
+        from chart_server import Chart_server
+        Chart_server(port=args.serve).serve_forever()
+        raise SystemExit
+
+    import startup_profile
+    if args.profile_startup:
+        startup_profile.enable()
+
+    import perf_trace
+    if args.perf:
+        perf_trace.enable()
+
+    # Import ici : les processus de rendu ("spawn") réimportent ce fichier sans lancer l'interface
+    with startup_profile.phase("import de l'interface"):
+        from interface import interface, use_extract, use_lean
+    perf_trace.instrument_interface(interface)
+
+    if args.lean:
+        use_lean()
+    if args.extract:
+        use_extract(args.extract, chunk_size=args.chunk_size)
+
+    with startup_profile.phase("construction de l'interface"):
+        interface = interface(panel_bitmaps=args.bitmaps, prewarm_map=args.prewarm_map,
+                              traffic=args.traffic)
+    perf_trace.attach(interface.window)
+    interface.run()
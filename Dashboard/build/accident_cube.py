@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+# Index dense (produit des tailles) tant qu'il reste raisonnable, np.unique au-delà
+DENSE_LIMIT = 1 << 22
+
+
+class Accident_cube:
+    """Accident measures summed over integer-coded dimensions.
+
+    Every dimension value is replaced by a small integer code (labels are
+    kept per dimension), and only the non-empty cells are stored: one
+    int32 code column per dimension plus one int64 column per measure.
+    Any slice or roll-up is then a mask and a bincount over those arrays,
+    whatever the combination of dimensions asked for. Folded chunks are
+    merged into the cells once their rows pass `compact_rows` (or the
+    current number of cells, if larger), so memory stays bounded by the
+    distinct cells rather than by the extract.
+    """
+
+    def __init__(self, dimensions, measures, compact_rows=1_000_000):
+        self.dimensions = list(dimensions)
+        self.measures = list(measures)
+        self.labels = {dim: [] for dim in self.dimensions}
+        self._codes_of = {dim: {} for dim in self.dimensions}
+        self.codes = {dim: np.empty(0, dtype=np.int32) for dim in self.dimensions}
+        self.values = np.empty((len(self.measures), 0), dtype=np.int64)
+        self.compact_rows = compact_rows
+        self._pending = []
+        self._pending_rows = 0
+
+    #methode pour convertir une colonne en codes entiers stables d'un morceau à l'autre
+    def _encode(self, dim, column):
+        local_codes, uniques = pd.factorize(column, use_na_sentinel=False)
+        codes_of = self._codes_of[dim]
+        mapping = np.empty(len(uniques), dtype=np.int32)
+        for i, label in enumerate(uniques):
+            label = None if pd.isna(label) else label.item() if hasattr(label, "item") else label
+            code = codes_of.get(label)
+            if code is None:
+                code = codes_of[label] = len(self.labels[dim])
+                self.labels[dim].append(label)
+            mapping[i] = code
+        return mapping[local_codes]
+
+    def fold(self, chunk):
+        """Add a chunk of per-accident rows (missing dimensions count as None)."""
+        coded = {}
+        for dim in self.dimensions:
+            column = chunk[dim] if dim in chunk.columns else pd.Series([None] * len(chunk))
+            coded[dim] = self._encode(dim, column)
+        for measure in self.measures:
+            coded[measure] = chunk[measure].to_numpy(dtype=np.int64) if measure in chunk.columns else 0
+        # une ligne par cellule non vide du morceau
+        cells = pd.DataFrame(coded).groupby(self.dimensions, sort=False)[self.measures].sum().reset_index()
+        self._pending.append(cells)
+        self._pending_rows += len(cells)
+        # fusion dès que l'attente dépasse le seuil ou la taille du cube (coût amorti linéaire)
+        if self._pending_rows >= max(self.compact_rows, self.values.shape[1]):
+            self.compact()
+        return self
+
+    #methode pour fusionner les morceaux en attente dans le cube
+    def compact(self):
+        if not self._pending:
+            return self
+        current = pd.DataFrame({dim: self.codes[dim] for dim in self.dimensions})
+        for measure, values in zip(self.measures, self.values):
+            current[measure] = values
+        cells = pd.concat([current, *self._pending], ignore_index=True)
+        cells = cells.groupby(self.dimensions, sort=False)[self.measures].sum().reset_index()
+        self._pending = []
+        self._pending_rows = 0
+        self.codes = {dim: cells[dim].to_numpy(dtype=np.int32) for dim in self.dimensions}
+        self.values = np.ascontiguousarray(cells[self.measures].to_numpy(dtype=np.int64).T)
+        return self
+
+    def __len__(self):
+        self.compact()
+        return len(self.values[0]) if len(self.measures) else 0
+
+    def _mask(self, where):
+        mask = None
+        for dim, wanted in (where or {}).items():
+            if isinstance(wanted, (str, int, float)) or wanted is None:
+                wanted = [wanted]
+            codes = [self._codes_of[dim][label] for label in wanted if label in self._codes_of[dim]]
+            selected = np.isin(self.codes[dim], np.asarray(codes, dtype=np.int32))
+            mask = selected if mask is None else mask & selected
+        return mask
+
+    def query(self, by=(), where=None, measures=None):
+        """Sum of `measures` per combination of `by`, over cells matching `where`.
+
+        `where` maps a dimension to one label or a list of labels. Only
+        combinations with at least one matching cell are returned.
+        """
+        self.compact()
+        by = [by] if isinstance(by, str) else list(by)
+        measures = self.measures if measures is None else list(measures)
+        rows = [self.measures.index(measure) for measure in measures]
+        mask = self._mask(where)
+        values = self.values[rows] if mask is None else self.values[rows][:, mask]
+
+        sizes = [len(self.labels[dim]) for dim in by]
+        if by:
+            codes = [self.codes[dim] if mask is None else self.codes[dim][mask] for dim in by]
+            flat = np.ravel_multi_index(codes, sizes)
+        else:
+            flat = np.zeros(values.shape[1], dtype=np.intp)
+        size = int(np.prod(sizes)) if by else 1
+
+        if size <= DENSE_LIMIT:
+            keys = np.flatnonzero(np.bincount(flat, minlength=size)) if by else np.zeros(1, dtype=np.intp)
+            sums = [np.bincount(flat, weights=row, minlength=size)[keys] for row in values]
+        else:
+            keys, inverse = np.unique(flat, return_inverse=True)
+            sums = [np.bincount(inverse, weights=row, minlength=len(keys)) for row in values]
+        sums = np.array(sums).reshape(len(rows), len(keys))
+
+        result = pd.DataFrame(sums.T.astype(np.int64), columns=measures)
+        if not by:
+            return result
+        for dim, codes in zip(by, np.unravel_index(keys, sizes)):
+            result[dim] = np.asarray(self.labels[dim], dtype=object)[codes]
+        return result.set_index(by)
+
+    def total(self, where=None):
+        """Totals of every measure over the matching cells, as a Series."""
+        return self.query(where=where).iloc[0]
+
+    def members(self, dim, where=None):
+        """Labels of `dim` present in the cells matching `where`."""
+        return list(self.query(by=[dim], where=where, measures=[]).index)
@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import numpy as np
+import pandas as pd
+
+# Colonnes des extraits par accident (une ligne = un accident)
+LATITUDE = "LATITUDE"
+LONGITUDE = "LONGITUDE"
+DATE = "DATE"
+REGION = "REGION"
+VILLE = "VILLE"
+CATEGORIE = "CATEGORIE"
+GRAVITE = "GRAVITE"
+CAUSE = "CAUSE"
+METEO = "METEO"
+TUES = "TUES"
+BLESSES_GRAVES = "BLESSES GRAVES"
+BLESSES_LEGERS = "BLESSES LEGERS"
+VICTIMES = [TUES, BLESSES_GRAVES, BLESSES_LEGERS]
+
+MORTEL = "MORTEL"
+NON_MORTEL = "NON MORTEL"
+
+
+#methode pour charger l'index spatial des régions depuis le GeoJSON
+def load_region_lookup(geojson_path, name_column="region"):
+    import geopandas as gpd
+    from region_lookup import Region_lookup
+    return Region_lookup(gpd.read_file(geojson_path).set_index(name_column))
+
+
+def assign_regions(lats, lons, lookup, chunk_size=250_000, workers=None):
+    """Region index of every point (-1 outside), computed in parallel chunks.
+
+    Each chunk is a vectorized Region_lookup.indices_at call; shapely and
+    NumPy release the GIL, so threads run the chunks concurrently.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    bounds = range(0, len(lats), chunk_size)
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        parts = pool.map(
+            lambda start: lookup.indices_at(lats[start:start + chunk_size], lons[start:start + chunk_size]),
+            bounds,
+        )
+        return np.concatenate(list(parts)) if len(bounds) else np.empty(0, dtype=np.int64)
+
+
+#methode pour étiqueter chaque accident avec sa région
+def tag_regions(df, lookup, **kwargs):
+    codes = assign_regions(df[LATITUDE].to_numpy(), df[LONGITUDE].to_numpy(), lookup, **kwargs)
+    categories = pd.Index(lookup.names)
+    return df.assign(**{REGION: pd.Categorical.from_codes(codes, categories=categories)})
+
+
+def aggregate_by_region(df):
+    """Accidents and victims per region, in the shape Accidents_Map joins on."""
+    victims = df[VICTIMES].sum(axis=1) if set(VICTIMES) <= set(df.columns) else 0
+    totals = (
+        df.assign(accidents=1, victims=victims)
+        .groupby(REGION, observed=False)[["accidents", "victims"]]
+        .sum()
+    )
+    return totals.rename_axis("region").reset_index()
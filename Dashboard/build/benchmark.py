@@ -0,0 +1,198 @@
+from pathlib import Path
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+
+base_dir = Path(__file__).parent
+file_path = base_dir.parent.parent / "accident_de_route_2017.xlsx"
+
+
+class Benchmark:
+    """Times named steps and collects the results for a JSON report."""
+
+    def __init__(self, repeat=5):
+        self.repeat = repeat
+        self.results = []
+
+    #methode pour chronométrer une étape plusieurs fois (setup non compté)
+    def time(self, group, name, run, setup=None, repeat=None, n=1):
+        samples = []
+        for _ in range(repeat or self.repeat):
+            arg = setup() if setup is not None else None
+            start = time.perf_counter()
+            run(arg) if setup is not None else run()
+            samples.append((time.perf_counter() - start) * 1000 / n)
+        samples.sort()
+        result = {
+            "group": group,
+            "name": name,
+            "n": n,
+            "repeat": len(samples),
+            "min_ms": samples[0],
+            "median_ms": statistics.median(samples),
+            "p95_ms": samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))],
+        }
+        self.results.append(result)
+        print(f"  {group:<10} {name:<48} {result['median_ms']:10.3f} ms (min {result['min_ms']:.3f})")
+        return result
+
+
+def bench_load(bench, workbook):
+    from sheet_store import Sheet_store
+
+    bench.time("load", "read_excel (sans cache)", lambda: Sheet_store(workbook, use_cache=False).load_all())
+    with tempfile.TemporaryDirectory() as cache_dir:
+        Sheet_store(workbook, cache_dir=cache_dir).load_all()
+        bench.time("load", "read_excel (cache disque chaud)", lambda: Sheet_store(workbook, cache_dir=cache_dir).load_all())
+
+
+def bench_charts(bench, workbook):
+    import matplotlib.pyplot as plt
+    from visualisation import Visualisation_des_accidents, CHART_SHEETS
+
+    visualizer = Visualisation_des_accidents(workbook)
+    visualizer.sheets.load_all()
+    for name in CHART_SHEETS:
+        plot = getattr(visualizer, name)
+        bench.time("figure", name, lambda: plt.close(plot()))
+
+        def draw(figure):
+            figure.canvas.draw()
+            plt.close(figure)
+        bench.time("draw", name, draw, setup=plot)
+
+
+def bench_aggregation(bench, accidents):
+    from ingestion import load_extract, JOUR, ANNEE
+    from accident_records import REGION, VILLE, CATEGORIE, GRAVITE, METEO
+
+    aggregates = None
+
+    def load():
+        nonlocal aggregates
+        aggregates = load_extract(accidents, progress=None)
+    bench.time("aggregate", f"load_extract ({Path(accidents).name})", load, repeat=1)
+    aggregates.cube.compact()
+    cube = aggregates.cube
+    queries = {
+        "cube: par région": dict(by=[REGION]),
+        "cube: villes d'une région": dict(by=[VILLE], where={REGION: "Oriental"}),
+        "cube: année x catégorie x gravité": dict(by=[ANNEE, CATEGORIE, GRAVITE]),
+        "cube: jour, météo et gravité filtrées": dict(by=[JOUR], where={METEO: "Pluie", GRAVITE: "MORTEL"}),
+    }
+    for name, query in queries.items():
+        bench.time("aggregate", name, lambda: cube.query(**query), repeat=20)
+    bench.time("aggregate", "to_sheets", lambda: aggregates.to_sheets(), repeat=3)
+
+
+def bench_map(bench):
+    import shapely
+    from region_table import region_table
+    from region_lookup import Region_lookup
+    from map_lod import Lod_pyramid
+    from mapc_accidents import region_styles
+
+    bench.time("map", "region_table (GeoJSON + jointure)", region_table, repeat=3)
+    gdf_map = region_table()
+
+    bench.time("map", "styles des régions", lambda: region_styles(gdf_map, "accidents"), repeat=20)
+
+    def pyramid():
+        lod = Lod_pyramid()
+        lod.add_level("regions", gdf_map.geometry, precompute=True)
+    bench.time("map", "pyramide LOD (tous les zooms)", pyramid, repeat=3)
+
+    lookup = Region_lookup(gdf_map)
+    min_x, min_y, max_x, max_y = shapely.total_bounds(np.asarray(gdf_map.geometry))
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(min_y, max_y, 1000)
+    lons = rng.uniform(min_x, max_x, 1000)
+
+    def hover():
+        for lat, lon in zip(lats, lons):
+            lookup.index_at(lat, lon)
+    bench.time("hover", "index_at (par point)", hover, n=len(lats))
+    big_lats = rng.uniform(min_y, max_y, 1_000_000)
+    big_lons = rng.uniform(min_x, max_x, 1_000_000)
+    bench.time("hover", "indices_at (1 M points)", lambda: lookup.indices_at(big_lats, big_lons), repeat=3)
+
+
+def metadata(scale):
+    import pandas as pd
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=base_dir,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "scale": scale,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "matplotlib": matplotlib.__version__,
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+    }
+
+
+#methode pour comparer deux séries de résultats
+def compare(current, previous_path):
+    previous = json.loads(Path(previous_path).read_text(encoding="utf-8"))
+    before = {(r["group"], r["name"]): r["median_ms"] for r in previous["results"]}
+    print(f"Comparaison avec {previous_path} ({previous['meta'].get('commit')})")
+    for r in current["results"]:
+        old = before.get((r["group"], r["name"]))
+        if old:
+            print(f"  {r['group']:<10} {r['name']:<48} x{old / r['median_ms']:6.2f}")
+
+
+def run(scale=1.0, groups=("load", "charts", "aggregate", "map"), workbook=None, accidents=None, repeat=5):
+    """Run the selected benchmark groups on data generated at `scale`."""
+    from synthetic_data import write_workbook, write_accidents
+
+    bench = Benchmark(repeat)
+    with tempfile.TemporaryDirectory() as tmp:
+        if workbook is None and scale != 1.0:
+            workbook = write_workbook(Path(tmp) / f"workbook_x{scale:g}.xlsx", scale)
+        workbook = workbook or file_path
+        if "load" in groups:
+            bench_load(bench, workbook)
+        if "charts" in groups:
+            bench_charts(bench, workbook)
+        if "aggregate" in groups:
+            if accidents is None:
+                accidents = write_accidents(Path(tmp) / f"accidents_x{scale:g}.csv", scale)
+            bench_aggregation(bench, accidents)
+        if "map" in groups:
+            bench_map(bench)
+    return {"meta": metadata(scale), "results": bench.results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesures de performance du tableau de bord")
+    parser.add_argument("--scale", type=float, default=1.0, help="volume des données synthétiques (1 = 2017)")
+    parser.add_argument("--groups", nargs="+", default=["load", "charts", "aggregate", "map"],
+                        choices=["load", "charts", "aggregate", "map"])
+    parser.add_argument("--workbook", help="classeur à mesurer au lieu d'un classeur synthétique")
+    parser.add_argument("--accidents", help="extrait par accident à mesurer (CSV ou Parquet)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="fichier JSON des résultats")
+    parser.add_argument("--compare", help="résultats JSON d'une exécution précédente")
+    args = parser.parse_args()
+
+    report = run(args.scale, args.groups, args.workbook, args.accidents, args.repeat)
+    out = Path(args.out or base_dir.parent.parent / "benchmarks" / f"bench_{report['meta']['timestamp'].replace(':', '')}_x{args.scale:g}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"Résultats : {out}")
+    if args.compare:
+        compare(report, args.compare)
@@ -0,0 +1,168 @@
+from collections import OrderedDict
+import base64
+import tkinter as tk
+import matplotlib.pyplot as plt
+from matplotlib.backend_bases import FigureCanvasBase
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+
+class Canvas_manager:
+    """One FigureCanvasTkAgg per screen slot, with a bounded LRU of figures.
+
+    Slots are keyed by their (x, y) position. Showing a chart swaps its figure
+    into the slot's existing canvas; figures pushed out of the LRU are closed.
+    With a panel_cache, slots first show a cached bitmap and only build the
+    interactive canvas when the pointer enters them.
+    """
+
+    def __init__(self, master, max_figures=12, panel_cache=None, dwell_ms=300):
+        self.master = master
+        self.dwell_ms = dwell_ms
+        self.max_figures = max_figures
+        self.panel_cache = panel_cache
+        self.slots = {}
+        self.labels = {}
+        self.pending = {}
+        self.shown = {}
+        self.visible = {}
+        self.generations = {}
+        self.figures = OrderedDict()
+        self._dwell = {}
+
+    #methode pour afficher un graphique dans un emplacement
+    def show(self, key, build, x, y, w, h):
+        if self.panel_cache is None:
+            return self.show_live(key, build, x, y, w, h)
+
+        png = self.panel_cache.get(key, w, h)
+        if png is None:
+            figure = self._figure((key, (x, y)), build)
+            png = self.panel_cache.render(key, figure, w, h)
+        self.show_bitmap(key, build, x, y, w, h, png)
+
+    #methode pour afficher une image déjà rendue, le canvas interactif vient au survol
+    def show_bitmap(self, key, build, x, y, w, h, png):
+        slot = (x, y)
+        label = self._label(slot)
+        image = tk.PhotoImage(master=self.master, data=base64.b64encode(png))
+        label.config(image=image, text="")
+        label.image = image
+        label.place(x=x, y=y, width=w, height=h)
+        label.lift()
+        self.pending[slot] = (key, build, w, h)
+        self.visible[slot] = (key, w, h)
+        self._next_generation(slot)
+
+    #methode pour réserver un emplacement pendant le rendu en arrière-plan
+    def show_placeholder(self, x, y, w, h, text="Chargement..."):
+        slot = (x, y)
+        label = self._label(slot)
+        label.config(image="", text=text, fg="white", font=("Inter", 12))
+        label.image = None
+        label.place(x=x, y=y, width=w, height=h)
+        label.lift()
+        self.pending.pop(slot, None)
+        self.visible.pop(slot, None)
+        return self._next_generation(slot)
+
+    #methode pour savoir si un emplacement a changé depuis une demande
+    def is_current(self, x, y, generation):
+        return self.generations.get((x, y)) == generation
+
+    def _next_generation(self, slot):
+        self.generations[slot] = self.generations.get(slot, 0) + 1
+        return self.generations[slot]
+
+    def _label(self, slot):
+        label = self.labels.get(slot)
+        if label is None:
+            label = tk.Label(self.master, borderwidth=0, highlightthickness=0, bg="#231E6D")
+            label.bind("<Enter>", lambda event, slot=slot: self._hover(slot))
+            label.bind("<Leave>", lambda event, slot=slot: self._cancel_hover(slot))
+            self.labels[slot] = label
+        return label
+
+    #methode pour passer au canvas interactif seulement si le pointeur s'attarde
+    def _hover(self, slot):
+        self._cancel_hover(slot)
+        self._dwell[slot] = self.master.after(self.dwell_ms, lambda: self._go_live(slot))
+
+    def _cancel_hover(self, slot):
+        after_id = self._dwell.pop(slot, None)
+        if after_id is not None:
+            self.master.after_cancel(after_id)
+
+    def _go_live(self, slot):
+        self._dwell.pop(slot, None)
+        request = self.pending.pop(slot, None)
+        if request is None:
+            return
+        key, build, w, h = request
+        self.show_live(key, build, slot[0], slot[1], w, h)
+
+    def show_live(self, key, build, x, y, w, h):
+        slot = (x, y)
+        figure = self._figure((key, slot), build)
+        canvas = self.slots.get(slot)
+
+        if canvas is None:
+            canvas = FigureCanvasTkAgg(figure, master=self.master)
+            canvas.get_tk_widget().place(x=x, y=y)
+            self.slots[slot] = canvas
+        elif canvas.figure is not figure:
+            old = canvas.figure
+            canvas.figure = figure
+            figure.set_canvas(canvas)
+            # la figure retirée n'est plus reliée au widget Tk
+            FigureCanvasBase(old)
+
+        self.shown[slot] = (key, slot)
+        self.visible[slot] = (key, w, h)
+        self._fit(canvas, w, h)
+        canvas.get_tk_widget().lift()
+        self.pending.pop(slot, None)
+        if slot in self.labels:
+            self.labels[slot].place_forget()
+        self._next_generation(slot)
+        self._evict()
+        return figure
+
+    #methode pour récupérer une figure récente ou la construire
+    def _figure(self, lru_key, build):
+        figure = self.figures.pop(lru_key, None)
+        if figure is None:
+            figure = build()
+        self.figures[lru_key] = figure
+        return figure
+
+    def _fit(self, canvas, w, h):
+        figure = canvas.figure
+        canvas.get_tk_widget().config(width=w, height=h)
+        figure.set_size_inches(w / figure.dpi, h / figure.dpi, forward=False)
+        canvas.draw()
+
+    #methode pour fermer les figures les plus anciennes au-delà de la limite
+    def _evict(self):
+        visible = set(self.shown.values())
+        for lru_key in list(self.figures):
+            if len(self.figures) <= self.max_figures:
+                break
+            if lru_key in visible:
+                continue
+            plt.close(self.figures.pop(lru_key))
+
+    def forget(self, keys):
+        """Drop the cached figures of these charts; return the slots showing them.
+
+        Result is {slot: (key, w, h)} so the caller can render them again.
+        """
+        keys = set(keys)
+        for lru_key in [k for k in self.figures if k[0] in keys]:
+            plt.close(self.figures.pop(lru_key))
+        return {slot: shown for slot, shown in self.visible.items() if shown[0] in keys}
+
+    def clear(self):
+        """Close every cached figure that is not currently displayed."""
+        visible = set(self.shown.values())
+        for lru_key in [k for k in self.figures if k not in visible]:
+            plt.close(self.figures.pop(lru_key))
@@ -0,0 +1,53 @@
+from pathlib import Path
+import matplotlib
+
+# Etat propre à chaque processus de rendu
+_visualizer = None
+
+
+#methode d'initialisation d'un processus de rendu (backend Agg, sans Tk)
+def init_worker(file_path, overrides=None, overrides_tag=None, lean=False):
+    global _visualizer
+    matplotlib.use("Agg")
+    from visualisation import Visualisation_des_accidents
+    _visualizer = Visualisation_des_accidents(file_path)
+    # le cache disque des feuilles n'est tenu à jour que par le processus principal
+    _visualizer.sheets.write_cache = False
+    if lean:
+        _visualizer.sheets.set_lean()
+    if overrides:
+        _visualizer.sheets.override(overrides, overrides_tag)
+
+
+#methode pour rendre un graphique plot_* (PNG par défaut) dans un processus de rendu
+def render_chart(name, w, h, fmt="png", data_version=None, frames=None):
+    import matplotlib.pyplot as plt
+    from panel_cache import render_png
+
+    # le classeur a changé depuis le lancement du processus : relire les feuilles modifiées
+    if data_version is not None and data_version != _visualizer.sheets.version():
+        _visualizer.sheets.reload()
+
+    # feuilles propres à la demande (panneau d'une région tiré de l'extrait)
+    visualizer = _visualizer.with_sheets(frames) if frames else _visualizer
+    figure = getattr(visualizer, name)()
+    try:
+        return render_png(figure, w, h, fmt)
+    finally:
+        plt.close(figure)
+
+
+#methode pour exporter un graphique plot_* dans un ou plusieurs formats
+def export_chart(name, out_dir, formats, dpi):
+    import matplotlib.pyplot as plt
+
+    figure = getattr(_visualizer, name)()
+    try:
+        paths = []
+        for fmt in formats:
+            path = Path(out_dir) / f"{name}.{fmt}"
+            figure.savefig(path, format=fmt, dpi=dpi, facecolor=figure.get_facecolor())
+            paths.append(str(path))
+        return paths
+    finally:
+        plt.close(figure)
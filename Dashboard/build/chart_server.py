@@ -0,0 +1,224 @@
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+
+from chart_render import init_worker, render_chart
+from sheet_store import content_hash
+
+base_dir = Path(__file__).parent
+file_path = base_dir.parent.parent / "accident_de_route_2017.xlsx"
+CONTENT_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+class Chart_server:
+    """Serves the dashboard charts and map regions over HTTP on localhost.
+
+    Routes: /charts (list), /chart/<plot_name>.png|svg?w=&h=,
+    /regions.json and /regions.geojson. Charts are rendered in a process
+    pool; responses are kept in an in-memory LRU keyed by the workbook
+    content hash, and the ETag is derived from that hash so a client
+    revalidating with If-None-Match gets a 304 without any rendering.
+    When the workbook changes, the cache is dropped and the workers are
+    restarted on the new data.
+    """
+
+    def __init__(self, file_path=file_path, port=8050, workers=None, max_entries=512, check_interval=1.0):
+        from visualisation import CHART_SHEETS
+        self.charts = list(CHART_SHEETS)
+        self.file_path = Path(file_path)
+        self.workers = workers or os.cpu_count()
+        self.max_entries = max_entries
+        self.check_interval = check_interval
+        self.cache = OrderedDict()
+        self.inflight = {}
+        self._lock = threading.Lock()
+        self._stat = None
+        self._checked = 0.0
+        self.version = None
+        self.executor = None
+        self._check_workbook(force=True)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}/"
+
+    def _start_pool(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(str(self.file_path),),
+        )
+
+    #methode pour invalider le cache quand le classeur change
+    def _check_workbook(self, force=False):
+        now = time.monotonic()
+        # appelée par chaque thread de requête : l'horodatage et l'empreinte sont lus sous le verrou
+        with self._lock:
+            if not force and now - self._checked < self.check_interval:
+                return
+            self._checked = now
+            previous = self._stat
+        stat = self.file_path.stat()
+        if (stat.st_size, stat.st_mtime_ns) == previous:
+            return
+        version = content_hash(self.file_path)
+        with self._lock:
+            self._stat = (stat.st_size, stat.st_mtime_ns)
+            if version == self.version:
+                return
+            old = self.executor
+            self.version = version
+            self.cache.clear()
+            self.inflight.clear()
+            self.executor = self._start_pool()
+        if old is not None:
+            print(f"Classeur modifié, cache vidé (version {version[:12]})")
+            old.shutdown(wait=False, cancel_futures=True)
+
+    def etag(self, key):
+        return '"' + hashlib.sha1(f"{self.version}|{key}".encode()).hexdigest()[:20] + '"'
+
+    def get(self, key, build):
+        """Cached (content type, body) for key, built once even under concurrent requests."""
+        with self._lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+            waiter = self.inflight.get(key)
+            if waiter is None:
+                waiter = self.inflight[key] = threading.Event()
+                owner = True
+                version = self.version
+            else:
+                owner = False
+        if not owner:
+            waiter.wait()
+            with self._lock:
+                if key in self.cache:
+                    return self.cache[key]
+            return build()
+
+        try:
+            response = build()
+            with self._lock:
+                # un rendu commencé avant un changement du classeur n'entre pas dans le nouveau cache
+                if self.version == version:
+                    self.cache[key] = response
+                    while len(self.cache) > self.max_entries:
+                        self.cache.popitem(last=False)
+            return response
+        finally:
+            with self._lock:
+                # après un changement, la clé peut déjà appartenir à un nouveau rendu
+                if self.inflight.get(key) is waiter:
+                    del self.inflight[key]
+            waiter.set()
+
+    def _chart(self, name, fmt, w, h, attempts=3):
+        for attempt in range(attempts):
+            try:
+                body = self.executor.submit(render_chart, name, w, h, fmt).result()
+                return CONTENT_TYPES[fmt], body
+            except CancelledError:
+                # l'ancien pool a été arrêté par un changement du classeur : relancé sur le nouveau
+                if attempt == attempts - 1:
+                    raise
+
+    #methode pour construire la table des régions (JSON ou GeoJSON)
+    def _regions(self, fmt):
+        from region_table import region_table
+        gdf_map = region_table()
+        if fmt == "geojson":
+            return "application/geo+json", gdf_map.reset_index().to_json().encode()
+        table = gdf_map.drop(columns="geometry").reset_index()
+        return "application/json", table.to_json(orient="records", force_ascii=False).encode()
+
+    def route(self, path, query):
+        """(key, build) for a request path, or None if unknown."""
+        if path == "/charts":
+            return path, lambda: ("application/json", json.dumps(self.charts).encode())
+        if path in ("/regions.json", "/regions.geojson"):
+            fmt = path.rsplit(".", 1)[1]
+            return path, lambda: self._regions(fmt)
+        if path.startswith("/chart/"):
+            name, _, fmt = path[len("/chart/"):].rpartition(".")
+            if name not in self.charts or fmt not in CONTENT_TYPES:
+                return None
+            w = int(query.get("w", ["640"])[0])
+            h = int(query.get("h", ["480"])[0])
+            if not (16 <= w <= 4096 and 16 <= h <= 4096):
+                return None
+            return f"{name}.{fmt}?{w}x{h}", lambda: self._chart(name, fmt, w, h)
+        return None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                try:
+                    server._check_workbook()
+                    route = server.route(url.path, parse_qs(url.query))
+                except (OSError, ValueError):
+                    route = None
+                if route is None:
+                    self.send_error(404)
+                    return
+                key, build = route
+                etag = server.etag(key)
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                try:
+                    content_type, body = server.get(key, build)
+                except Exception as e:
+                    print(f"Erreur de rendu {key} : {e!r}")
+                    self.send_error(500)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def serve_forever(self):
+        print(f"Tableau de bord servi sur {self.url}")
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serveur HTTP local des graphiques et de la carte")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    Chart_server(port=args.port, workers=args.workers).serve_forever()
@@ -0,0 +1,99 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+
+from chart_render import init_worker, export_chart
+
+base_dir = Path(__file__).parent
+file_path = base_dir.parent.parent / "accident_de_route_2017.xlsx"
+FORMATS = ("png", "svg", "pdf")
+
+
+#methode pour calculer l'empreinte des données et du code d'un graphique
+def chart_hash(sheets, name, sheet_names, formats, dpi):
+    digest = hashlib.sha256()
+    digest.update(sheets.fingerprint(sheet_names).encode())
+    digest.update((base_dir / "visualisation.py").read_bytes())
+    digest.update(f"{name}|{','.join(formats)}|{dpi}".encode())
+    return digest.hexdigest()
+
+
+def export_all(out_dir, formats=("png",), dpi=150, workers=None, only=None, skip_unchanged=False):
+    """Render every plot_* chart to files, one chart per worker process.
+
+    The parent loads the workbook once, which fills the sheet disk cache;
+    workers then read the parsed sheets from that cache instead of the
+    xlsx. With skip_unchanged, charts whose input sheets, plotting code,
+    formats and DPI hash the same as in the last export are not redrawn.
+    """
+    from visualisation import Visualisation_des_accidents, CHART_SHEETS
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / "manifest.json"
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        manifest = {}
+
+    start = time.perf_counter()
+    visualizer = Visualisation_des_accidents(file_path)
+    visualizer.sheets.load_all()
+
+    charts = {}
+    for name, sheet_names in CHART_SHEETS.items():
+        if only and name not in only:
+            continue
+        digest = chart_hash(visualizer.sheets, name, sheet_names, formats, dpi)
+        entry = manifest.get(name, {})
+        unchanged = entry.get("hash") == digest and all(Path(p).exists() for p in entry.get("files", []))
+        if skip_unchanged and unchanged:
+            print(f"  {name:<45} inchangé")
+            continue
+        charts[name] = digest
+
+    if charts:
+        workers = min(workers or os.cpu_count(), len(charts))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(str(file_path),),
+        ) as pool:
+            futures = {pool.submit(export_chart, name, str(out_dir), formats, dpi): name for name in charts}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    files = future.result()
+                except Exception as e:
+                    print(f"  {name:<45} échec : {e!r}")
+                    manifest.pop(name, None)
+                    continue
+                manifest[name] = {"hash": charts[name], "files": files}
+                print(f"  {name:<45} {', '.join(Path(f).name for f in files)}")
+
+    tmp = manifest_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, manifest_path)
+    print(f"{len(charts)} graphique(s) exporté(s) dans {out_dir} en {time.perf_counter() - start:.2f} s")
+    return manifest
+
+
+# Exporter les graphiques sans interface graphique
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export des graphiques du tableau de bord (sans Tk)")
+    parser.add_argument("--out", default=str(base_dir.parent.parent / "exports"), help="dossier de sortie")
+    parser.add_argument("--format", dest="formats", nargs="+", choices=FORMATS, default=["png"])
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--workers", type=int, default=None, help="nombre de processus (défaut : nombre de cœurs)")
+    parser.add_argument("--only", nargs="+", metavar="PLOT", help="exporter seulement ces méthodes plot_*")
+    parser.add_argument("--skip-unchanged", action="store_true",
+                        help="ne pas réexporter les graphiques dont les données n'ont pas changé")
+    args = parser.parse_args()
+
+    export_all(args.out, tuple(args.formats), args.dpi, args.workers, args.only, args.skip_unchanged)
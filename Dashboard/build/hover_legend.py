@@ -0,0 +1,70 @@
+import time
+
+
+class Legend_hover:
+    """Shows a legend while the pointer is over the given axes.
+
+    The axes are captured explicitly instead of read from pyplot's global
+    state. Only visibility changes are acted upon, at most once per frame,
+    and the legend is blitted over a cached background instead of
+    redrawing the whole figure.
+    """
+
+    def __init__(self, figure, axes, legend, frame_ms=33):
+        self.figure = figure
+        self.axes = tuple(axes) if isinstance(axes, (list, tuple)) else (axes,)
+        self.legend = legend
+        self.frame_ms = frame_ms
+        self.visible = legend.get_visible()
+        self.wanted = self.visible
+        self._last_apply = 0.0
+        self._timer = None
+        self._background = None
+
+        # la légende est dessinée à part, jamais lors d'un rendu complet
+        legend.set_animated(True)
+        # fonctions (et non méthodes liées) : mpl ne garderait qu'une référence faible
+        figure.canvas.mpl_connect("motion_notify_event", lambda event: self.on_motion(event))
+        figure.canvas.mpl_connect("figure_leave_event", lambda event: self.on_motion(event))
+        figure.canvas.mpl_connect("draw_event", lambda event: self.on_draw(event))
+
+    #methode pour mémoriser le fond après chaque rendu complet
+    def on_draw(self, event):
+        canvas = event.canvas
+        if getattr(canvas, "supports_blit", False):
+            self._background = canvas.copy_from_bbox(self.figure.bbox)
+        else:
+            self._background = None
+        if self.visible:
+            self.figure.draw_artist(self.legend)
+
+    def on_motion(self, event):
+        self.wanted = event.inaxes is not None and event.inaxes in self.axes
+        if self.wanted == self.visible:
+            return
+        # regrouper les transitions rapprochées sur une image
+        wait_ms = self.frame_ms - (time.perf_counter() - self._last_apply) * 1000
+        if wait_ms <= 0:
+            self._apply()
+        elif self._timer is None:
+            self._timer = event.canvas.new_timer(interval=int(wait_ms) + 1)
+            self._timer.single_shot = True
+            self._timer.add_callback(self._apply)
+            self._timer.start()
+
+    def _apply(self):
+        self._timer = None
+        if self.wanted == self.visible:
+            return
+        self._last_apply = time.perf_counter()
+        self.visible = self.wanted
+        self.legend.set_visible(self.visible)
+
+        canvas = self.figure.canvas
+        if self._background is None or not getattr(canvas, "supports_blit", False):
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self._background)
+        if self.visible:
+            self.figure.draw_artist(self.legend)
+        canvas.blit(self.figure.bbox)
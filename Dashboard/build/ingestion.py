@@ -0,0 +1,243 @@
+from pathlib import Path
+import time
+import pandas as pd
+
+from accident_cube import Accident_cube
+from accident_records import (
+    DATE, REGION, VILLE, CATEGORIE, GRAVITE, CAUSE, METEO,
+    TUES, BLESSES_GRAVES, BLESSES_LEGERS, MORTEL, NON_MORTEL, tag_regions,
+)
+
+JOUR = "JOUR DE SEMAINE"
+ANNEE = "ANNEE"
+ACCIDENTS = "ACCIDENTS"
+MEASURES = [ACCIDENTS, TUES, BLESSES_GRAVES, BLESSES_LEGERS]
+JOURS = ["LUNDI", "MARDI", "MERCREDI", "JEUDI", "VENDREDI", "SAMEDI", "DIMANCHE"]
+
+# Régions des panneaux détaillés (boutons 1 à 3)
+DAKHLA = "Dakhla-Oued Eddahab"
+TANGER = "Tanger-Tetouan-Hoceima"
+CASABLANCA = "Casablanca-Settat"
+
+# Dimensions du cube d'agrégats
+DIMENSIONS = [REGION, VILLE, JOUR, ANNEE, CATEGORIE, GRAVITE, CAUSE, METEO]
+
+
+#methode pour ajouter les colonnes dérivées (jour, année, compteur)
+def prepare_chunk(chunk):
+    columns = {ACCIDENTS: 1}
+    if DATE in chunk.columns and (JOUR not in chunk.columns or ANNEE not in chunk.columns):
+        dates = pd.to_datetime(chunk[DATE], errors="coerce")
+        if JOUR not in chunk.columns:
+            columns[JOUR] = pd.Categorical.from_codes(dates.dt.dayofweek.fillna(-1).astype(int), JOURS)
+        if ANNEE not in chunk.columns:
+            columns[ANNEE] = dates.dt.year.astype("Int32")
+    for measure in MEASURES[1:]:
+        if measure not in chunk.columns:
+            columns[measure] = 0
+    return chunk.assign(**columns)
+
+
+class Accident_aggregates:
+    """Running sums of a per-accident extract, folded one chunk at a time.
+
+    The sums live in an Accident_cube over DIMENSIONS, so memory stays
+    bounded by the chunk size plus the non-empty cells. to_sheets()
+    rebuilds the workbook sheets the plot methods read, and
+    region_sheets() gives the detail panels of any region.
+    """
+
+    def __init__(self):
+        self.cube = Accident_cube(DIMENSIONS, MEASURES)
+        self.rows = 0
+
+    def fold(self, chunk):
+        self.cube.fold(prepare_chunk(chunk))
+        self.rows += len(chunk)
+        return self
+
+    #methode pour savoir si l'extrait renseigne une dimension
+    def has(self, *dims):
+        return all(any(label is not None for label in self.cube.labels[dim]) for dim in dims)
+
+    def table(self, by, where=None):
+        """Aggregated measures as a DataFrame with one column per dimension."""
+        return self.cube.query(by, where).reset_index()
+
+    #methode pour retrouver les totaux par région attendus par Accidents_Map
+    def region_totals(self):
+        df = self.table([REGION])
+        df = df[df[REGION].notna()]
+        return pd.DataFrame({
+            "region": df[REGION].astype(str),
+            "accidents": df[ACCIDENTS],
+            "victims": df[TUES] + df[BLESSES_GRAVES] + df[BLESSES_LEGERS],
+        }).reset_index(drop=True)
+
+    def to_sheets(self, population=None):
+        """Cleaned workbook sheets rebuilt from the aggregates."""
+        sheets = {}
+        if self.has(CATEGORIE):
+            by_cat = self._by_gravite([CATEGORIE])
+            sheets["Accident_corporels"] = pd.DataFrame({
+                "CATEGORIE": by_cat[CATEGORIE],
+                "MORTELS": by_cat["MORT"],
+                "N. MORTELS": by_cat["N.MORT"],
+            })
+
+        if self.has(JOUR):
+            by_day = self._by_gravite([JOUR])
+            by_day[JOUR] = pd.Categorical(by_day[JOUR], JOURS, ordered=True)
+            by_day = by_day.dropna(subset=[JOUR]).sort_values(JOUR)
+            sheets["ACCID_VICTIME_PAR_JOUR"] = pd.DataFrame({
+                "JOUR DE SEMAINE": by_day[JOUR].astype(str),
+                "ACCID N.MORT": by_day["N.MORT"],
+                "ACCID MORT": by_day["MORT"],
+                "ACCID\nTOTAL": by_day["N.MORT"] + by_day["MORT"],
+                "TUES": by_day[TUES],
+                "BLES LEGER": by_day[BLESSES_LEGERS],
+                "BLES GRAV": by_day[BLESSES_GRAVES],
+            }).reset_index(drop=True)
+
+        if self.has(ANNEE, CATEGORIE):
+            sheets.update(self._yearly_sheets())
+
+        if self.has(REGION):
+            totals = self.region_totals()
+            totals["population"] = totals["region"].map(population or {})
+            unknown = totals.loc[totals["population"].isna(), "region"].tolist()
+            if population and unknown:
+                # graphie différente de REGION_DATA : la région n'aura pas de taille dans le graphique
+                print(f"Population inconnue pour {len(unknown)} région(s) : {', '.join(map(str, unknown))}")
+            sheets["accid_popul_region"] = totals[["region", "accidents", "population"]]
+            panels = {"Sheet7": TANGER, "Sheet2": TANGER, "ACCI_CASA": CASABLANCA,
+                      "CAUSE_ACC_CASA": CASABLANCA, "ACCID_METEO_DAKHLA": DAKHLA,
+                      "ACCID_AGLO_DAKHLA_OUED_EDDAHAB": DAKHLA}
+            for sheet_name, region in panels.items():
+                frame = self.region_sheets(region).get(sheet_name)
+                if frame is not None:
+                    sheets[sheet_name] = frame
+        return sheets
+
+    def region_sheets(self, region):
+        """Detail panel frames of one region, in the shapes of the workbook sheets.
+
+        Keys are the sheets the Tanger, Casablanca and Dakhla panels read
+        (cities, causes, weather, category); any region gets all of them.
+        """
+        where = {REGION: region}
+        sheets = {}
+        if self.has(VILLE):
+            cities = self.table([VILLE], where).dropna(subset=[VILLE])
+            cities = pd.DataFrame({"City": cities[VILLE].astype(str), "Total_Accidents": cities[ACCIDENTS]})
+            sheets["Sheet7"] = sheets["ACCI_CASA"] = cities
+        if self.has(CAUSE):
+            causes = self.table([CAUSE], where).dropna(subset=[CAUSE])
+            sheets["Sheet2"] = pd.DataFrame({"causes": causes[CAUSE].astype(str), "nbr acc": causes[ACCIDENTS]})
+            sheets["CAUSE_ACC_CASA"] = pd.DataFrame({
+                "Cause des Accidents": causes[CAUSE].astype(str),
+                "Pourcentage Approximatif (%)": causes[ACCIDENTS] / causes[ACCIDENTS].sum(),
+            })
+        if self.has(METEO):
+            weather = self._by_gravite([METEO], where).dropna(subset=[METEO])
+            sheets["ACCID_METEO_DAKHLA"] = pd.DataFrame({
+                "Condition Météo": weather[METEO].astype(str),
+                "Accidents Totaux": weather["MORT"] + weather["N.MORT"],
+                "Accidents Mortels": weather["MORT"],
+                "Accidents Non Mortels": weather["N.MORT"],
+            })
+        if self.has(CATEGORIE):
+            category = self._by_gravite([CATEGORIE], where).dropna(subset=[CATEGORIE])
+            sheets["ACCID_AGLO_DAKHLA_OUED_EDDAHAB"] = pd.DataFrame({
+                "CATEGORIE": category[CATEGORIE].astype(str),
+                "ACCID N.MORT": category["N.MORT"],
+                "ACCID MORT": category["MORT"],
+                "TOTAL": category["N.MORT"] + category["MORT"],
+                "TUES": category[TUES],
+                "BLESSE LEGERS": category[BLESSES_LEGERS],
+                "BLESSE GRAVES": category[BLESSES_GRAVES],
+            })
+        return sheets
+
+    #methode pour séparer les accidents mortels et non mortels en colonnes
+    def _by_gravite(self, dims, where=None):
+        victims = self.cube.query(dims, where, [TUES, BLESSES_GRAVES, BLESSES_LEGERS])
+        mortels = self.cube.query(dims, {**(where or {}), GRAVITE: MORTEL}, [ACCIDENTS])[ACCIDENTS]
+        non_mortels = self.cube.query(dims, {**(where or {}), GRAVITE: NON_MORTEL}, [ACCIDENTS])[ACCIDENTS]
+        result = victims.assign(
+            MORT=mortels.reindex(victims.index, fill_value=0),
+            **{"N.MORT": non_mortels.reindex(victims.index, fill_value=0)},
+        )
+        return result.reset_index()
+
+    def _yearly_sheets(self):
+        by_year = self.cube.query([ANNEE], {ANNEE: [y for y in self.cube.labels[ANNEE] if y is not None]})
+        by_year = by_year.sort_index()
+        years = by_year.index
+
+        def per_year(where, column=ACCIDENTS):
+            return self.cube.query([ANNEE], where, [column])[column].reindex(years, fill_value=0)
+
+        rows = {
+            "ACCIDENTS HORS AGGLOMERATION": per_year({CATEGORIE: "HORS AGGLOMERATION"}),
+            "ACCIDENTS EN AGGLOMERATION": per_year({CATEGORIE: "EN AGGLOMERATION"}),
+            "TOTAL ACCIDENTS": by_year[ACCIDENTS],
+            "ACCIDENTS MORTELS": per_year({GRAVITE: MORTEL}),
+            "TUES": by_year[TUES],
+            "BLESSES": by_year[BLESSES_GRAVES] + by_year[BLESSES_LEGERS],
+        }
+        evolution = pd.DataFrame(rows).T
+        evolution.columns = [int(year) for year in years]
+        evolution = evolution.reset_index().rename(columns={"index": "Unnamed: 0"})
+
+        victims = self.table([ANNEE, CATEGORIE]).dropna(subset=[ANNEE, CATEGORIE]).rename(columns={CATEGORIE: "TYPE"})
+        victims = victims.assign(TOTAL=victims[TUES] + victims[BLESSES_GRAVES] + victims[BLESSES_LEGERS])
+        victims = victims[["TYPE", TUES, BLESSES_GRAVES, BLESSES_LEGERS, "TOTAL", ANNEE]]
+        return {"Evolution_accident_2008_2020": evolution, "Victimes_2016_2017": victims}
+
+
+def extract_columns(path):
+    """Column names of a CSV/Parquet extract, read from its header only."""
+    path = Path(path)
+    if path.suffix.lower() in (".parquet", ".pq"):
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(path).names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def extract_tag(path):
+    """Cheap identity of an extract (no full read), used to key derived caches."""
+    stat = Path(path).stat()
+    return f"{Path(path).name}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+#methode pour lire un extrait par morceaux de taille fixe
+def read_extract(path, chunk_size=500_000, columns=None):
+    path = Path(path)
+    if path.suffix.lower() in (".parquet", ".pq"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=columns)
+
+
+def print_progress(rows, seconds):
+    print(f"  {rows:,} accidents lus ({rows / max(seconds, 1e-9):,.0f}/s)")
+
+
+def load_extract(path, chunk_size=500_000, lookup=None, progress=print_progress):
+    """Fold a per-accident CSV/Parquet extract into Accident_aggregates.
+
+    Records without a REGION column are tagged from their coordinates with
+    `lookup` (see accident_records.load_region_lookup).
+    """
+    aggregates = Accident_aggregates()
+    start = time.perf_counter()
+    for chunk in read_extract(path, chunk_size):
+        if REGION not in chunk.columns and lookup is not None:
+            chunk = tag_regions(chunk, lookup)
+        aggregates.fold(chunk)
+        if progress is not None:
+            progress(aggregates.rows, time.perf_counter() - start)
+    return aggregates
@@ -2,20 +2,92 @@ from pathlib import Path
 from tkinter import Tk, Canvas, Entry, Text, Button, PhotoImage
 import pandas as pd
 import numpy as np
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
-from visualisation import Visualisation_des_accidents
+from visualisation import Visualisation_des_accidents, charts_using
 from mapc_accidents import Accidents_Map
-from live_map import Live_map
+from canvas_manager import Canvas_manager
+from panel_cache import Panel_cache
+from render_scheduler import Render_scheduler
+from workbook_watch import Workbook_watcher
+from panel_prefetch import Panel_prefetcher
+from map_process import Map_process
+from ui_assets import Ui_assets, STATIC_LAYERS
+from startup_profile import phase, report_when_idle
+from region_table import REGION_DATA, geojson_path
 
 base_dir = Path(__file__).parent  # Location of Main.py
 file_path = base_dir.parent.parent / "accident_de_route_2017.xlsx" 
-visualizer = Visualisation_des_accidents(file_path)
+with phase("chargement des feuilles"):
+    visualizer = Visualisation_des_accidents(file_path)
+    visualizer.sheets.load_all()
+visualizer.sheets.report_timings()
+
+# Panneaux régionaux des boutons 1 (Dakhla), 2 (Tanger) et 3 (Casablanca)
+REGION_PANELS = {
+    1: [
+        ("plot_3d_victimes_dakhla", 44, 572, 399, 454),
+        ("plot_accidents_par_conditions_meteo_dakhla", 465, 572, 473, 453),
+        ("plot_accidents_par_categorie_dakhla", 958, 572, 399, 454),
+    ],
+    2: [
+        ("plot_accidents_par_categorie_tng", 44, 572, 399, 454),
+        ("plot_accidents_par_cause_tng", 465, 572, 473, 453),
+        ("plot_accidents_par_villes_tng", 958, 572, 399, 454),
+    ],
+    3: [
+        ("plot_accidents_par_categorie_casa", 958, 572, 399, 454),
+        ("plot_evolution_des_accidents_casa", 44, 572, 399, 454),
+        ("plot_accidents_par_jours_casa", 465, 572, 473, 453),
+    ],
+}
+
+# Agrégats d'un extrait par accident (--extract), sinon None
+aggregates = None
+
+
+def use_extract(path, chunk_size=500_000):
+    """Feed the charts and the map from a per-accident CSV/Parquet extract.
+
+    The extract is streamed in chunks into running aggregates; sheets it
+    cannot rebuild (victims per user category, roads) keep coming from
+    the workbook.
+    """
+    global aggregates
+    from ingestion import load_extract, extract_columns, extract_tag
+    from accident_records import REGION, load_region_lookup
+
+    lookup = None
+    if REGION not in extract_columns(path):
+        lookup = load_region_lookup(geojson_path)
+    with phase("lecture de l'extrait"):
+        aggregates = load_extract(path, chunk_size=chunk_size, lookup=lookup)
+    population = dict(zip(REGION_DATA['region'], REGION_DATA['population']))
+    visualizer.sheets.override(aggregates.to_sheets(population), extract_tag(path))
+    print(f"Extrait {path} : {aggregates.rows:,} accidents")
+
+
+def use_lean():
+    """Keep the sheets in smaller dtypes (categoricals, int32), here and in the render workers."""
+    visualizer.sheets.set_lean()
+
+
+#methode pour obtenir les chiffres par région de la carte (extrait s'il est chargé)
+def region_data():
+    if aggregates is None:
+        return REGION_DATA
+    totals = aggregates.region_totals().set_index("region")
+    return {
+        'region': REGION_DATA['region'],
+        'population': REGION_DATA['population'],
+        'accidents': [int(totals["accidents"].get(region, 0)) for region in REGION_DATA['region']],
+        'victims': [int(totals["victims"].get(region, 0)) for region in REGION_DATA['region']],
+    }
 
 class interface:
-    def __init__(self):
+    def __init__(self, panel_bitmaps=False, prewarm_map=False, traffic=None):
         # Créer une fenêtre principale
-        self.window = Tk()
+        with phase("création de la fenêtre Tk"):
+            self.window = Tk()
         self.window.geometry("1920x1080")
         self.window.configure(bg="#110E43")
         self.window.resizable(False, False)
@@ -37,34 +109,127 @@ class interface:
         )
         self.canvas.place(x=0, y=0)
 
+        # Un canvas matplotlib réutilisé par emplacement de l'écran
+        # En mode bitmaps, les panneaux sont des images en cache jusqu'au survol
+        panel_cache = None
+        if panel_bitmaps:
+            panel_cache = Panel_cache(visualizer.sheets.cache_dir / "panels", visualizer.chart_version)
+        self.canvases = Canvas_manager(self.window, panel_cache=panel_cache)
         
-        self.setup_ui()
-        self.setup_buttons()
-        
-        self.display_graph_in_ui(visualizer.plot_accidents_par_categorie(), 1402, 100, 480, 290)
-        self.display_graph_in_ui(visualizer.plot_evolution_des_accidents(), 27, 151, 622, 380)
-        self.display_graph_in_ui(visualizer.plot_accidents_par_population(),678,100,702,431)
-        self.display_graph_in_ui(visualizer.plot_victimes_par_categorie_usagers(), 466, 572, 473, 454)
-            
+        self.panel_cache = panel_cache
+        # images des rendus en arrière-plan, gardées en mémoire si le mode bitmaps est désactivé
+        self.png_cache = panel_cache or Panel_cache(None, visualizer.chart_version, max_bytes=16 * 1024 * 1024)
+        # rendu en cours par emplacement (annulé si un autre clic le remplace)
+        self.slot_jobs = {}
+        with phase("setup_ui"):
+            self.setup_ui()
+        with phase("setup_buttons"):
+            self.setup_buttons()
+
+        # Les graphiques de démarrage sont rendus en parallèle, hors du thread Tk
+        with phase("lancement des rendus de démarrage"):
+            sheets = visualizer.sheets
+            self.renderer = Render_scheduler(
+                self.window, file_path,
+                overrides={name: sheets.frames[name] for name in sheets.overridden},
+                overrides_tag=sheets.override_tag,
+                lean=sheets.lean,
+            )
+            self.window.protocol("WM_DELETE_WINDOW", self.close)
+            self.display_graph_async(visualizer.plot_accidents_par_categorie, 1402, 100, 480, 290)
+            self.display_graph_async(visualizer.plot_evolution_des_accidents, 27, 151, 622, 380)
+            self.display_graph_async(visualizer.plot_accidents_par_population,678,100,702,431)
+            self.display_graph_async(visualizer.plot_victimes_par_categorie_usagers, 465, 572, 473, 454)
 
-        self.map_window = None  
+        # Les panneaux régionaux sont préparés en arrière-plan quand l'utilisateur ne fait rien
+        self.prefetcher = Panel_prefetcher(self.window, self.renderer, self.png_cache, REGION_PANELS,
+                                           history_path=visualizer.sheets.cache_dir / "clicks.json")
+        self.prefetcher.start()
+
+        # Les feuilles modifiées dans Excel sont relues sans redémarrer
+        self.watcher = Workbook_watcher(self.window, visualizer.sheets, self.on_workbook_changed)
+
+        # La carte (geopandas, tkintermapview) est construite après la première image
+        self.map_interface = None
+        self.traffic_source = traffic
+        self.window.after(0, self.setup_map)
+        report_when_idle(self.window)
+
+        # La carte ADM Trafic tourne dans son propre processus (Qt et Chromium hors du processus Tk)
+        self.live_map = Map_process()
+        if prewarm_map:
+            self.window.after(5000, self.live_map.start)
 
 
     #methode pour ouvrir la carte ADM Trafic
     def open_adm_trafic_map(self):
-        if not self.map_window: 
-            self.map_window = Live_map()
-            self.map_window.show()
-        else:
-            self.map_window.activateWindow()  # Réactiver si elle est déjà ouverte
+        # le processus est lancé au premier clic, puis réutilisé (page déjà chargée)
+        self.live_map.focus()
+        self.window.after(3000, self._check_live_map)
+
+    #methode pour signaler (une seule fois) que la carte ADM Trafic n'a pas pu démarrer
+    def _check_live_map(self):
+        error = self.live_map.check()
+        if error is not None:
+            from tkinter import messagebox
+            messagebox.showerror("Carte ADM Trafic", f"{error}.\nVérifiez l'installation de PySide6 (QtWebEngine).",
+                                 parent=self.window)
 
      #methode pour afficher le graphique dans l'interface       
-    def display_graph_in_ui(self, figure,x1,y1,w,h):
-        canvas = FigureCanvasTkAgg(figure, master=self.window)
-        canvas.get_tk_widget().place(x=x1, y=y1)  
-        canvas.get_tk_widget().config(width=w, height=h)
-        canvas.draw()
+    def display_graph_in_ui(self, plot,x1,y1,w,h):
+        return self.canvases.show(plot.__name__, plot, x1, y1, w, h)
     
+    #methode pour annuler le rendu encore en attente d'un emplacement
+    def _supersede(self, x1, y1):
+        future = self.slot_jobs.pop((x1, y1), None)
+        if future is not None:
+            future.cancel()
+
+     #methode pour afficher un graphique rendu en arrière-plan, avec un emplacement d'attente
+    def display_graph_async(self, plot, x1, y1, w, h, keep_current=False, key=None, frames=None):
+        name = plot.__name__
+        key = key or name
+        # seule la dernière demande d'un emplacement est conservée
+        self._supersede(x1, y1)
+        if frames is None:
+            png = self.png_cache.get(name, w, h)
+            if png is not None:
+                self.canvases.show_bitmap(name, plot, x1, y1, w, h, png)
+                return
+
+        def on_rendered(png):
+            if frames is None:
+                self.png_cache.put(name, w, h, png, version=version)
+            # l'emplacement a pu être pris par un clic entre temps
+            if self.canvases.is_current(x1, y1, generation):
+                self.canvases.show_bitmap(key, plot, x1, y1, w, h, png)
+
+        def on_error(error):
+            if self.canvases.is_current(x1, y1, generation):
+                self.canvases.show(key, plot, x1, y1, w, h)
+
+        # en rafraîchissement, l'ancien graphique reste affiché jusqu'au nouveau rendu
+        if keep_current:
+            generation = self.canvases.generations.get((x1, y1))
+        else:
+            generation = self.canvases.show_placeholder(x1, y1, w, h)
+        # rendu d'une version des données : rangé sous celle-ci même si le classeur change entre temps
+        version = self.png_cache.version_of(name)
+        future = self.renderer.submit(name, w, h, on_rendered, on_error=on_error, frames=frames)
+        self.slot_jobs[(x1, y1)] = future
+
+    #methode pour redessiner les graphiques visibles qui lisent une feuille modifiée
+    def on_workbook_changed(self, changed):
+        charts = charts_using(changed)
+        print(f"Classeur modifié : {', '.join(changed)} ({len(charts)} graphique(s) concerné(s))")
+        version = visualizer.sheets.version()
+        self.renderer.data_version = version
+        # seules les images des graphiques concernés sont jetées
+        self.png_cache.invalidate(charts)
+        self.prefetcher.invalidate(charts)
+        for (x, y), (key, w, h) in self.canvases.forget(charts).items():
+            self.display_graph_async(getattr(visualizer, key), x, y, w, h, keep_current=True)
+
      #methode pour gerer le chemin des fichiers
     def relative_to_assets(self, path: str) -> Path:
         """Helper method to get paths relative to assets directory."""
@@ -72,58 +237,61 @@ class interface:
     
     
     def setup_ui(self):
-        """Setup static UI components like text and images."""
-        # ajouter les images
-        image_image_1 = PhotoImage(file=self.relative_to_assets("image_1.png"))
-        self.canvas.create_image(960.0, 44.0, image=image_image_1)
-
-        self.canvas.create_text(
-            107.0, 28.0,
-            anchor="nw",
-            text="ETUDE DES ACCIDENTS DE ROUTE AU MAROC",
-            fill="#FFFFFF",
-            font=("Inter SemiBold", 28 * -1)
-        )
+        """Draw the static layers: one pre-composited background image."""
+        # fond et atlas des boutons composés une fois (python ui_assets.py), un seul décodage chacun
+        self.ui_assets = Ui_assets(self.window)
+        self.canvas.create_image(0, 0, anchor="nw", image=self.ui_assets.background)
+
+        # sans la police Inter à la composition, le titre reste un texte du canvas
+        if not self.ui_assets.title_baked:
+            _, position, text, family, pixels = STATIC_LAYERS[1]
+            self.canvas.create_text(
+                *position,
+                anchor="nw",
+                text=text,
+                fill="#FFFFFF",
+                font=(family, pixels * -1)
+            )
 
-        #positionner les images
-        images = [
-           
-            ("image_17.png", (1649.0, 740.0)),
-            ("image_3.png", (1649.0, 256.0)),
-            ("image_4.png", (1029.0, 320.0)),
-            ("image_5.png", (343.0, 344.0)),
-            ("image_6.png", (703.0, 800.0)),
-            ("image_8.png", (243.0, 799.0)),
-            ("image_9.png", (702.0, 799.0)),
-            ("image_10.png", (1157.0, 799.0)),
-            ("image_11.png", (64.0, 39.0)),
-            ("image_14.png", (243, 799.0)),
-            ("image_16.png", (1168.0, 799.0))
-        ]
 
-        for image_name, position in images:
-            img = PhotoImage(file=self.relative_to_assets(image_name))
-            self.canvas.create_image(*position, image=img)
-            setattr(self, f"{image_name.split('.')[0]}_img", img)  
-         
-   
     # Intégrer la carte
+    def setup_map(self):
+        """Build the accidents map once the window is on screen."""
         base_dir = Path(__file__).parent  # Location of Main.py
         geojson_path = base_dir.parent.parent / "morocco_regions.geojson"
         #geojson_path = "morocco_regions.geojson"
-        data = {
-            'region': [
-                'Tanger-Tetouan-Hoceima', 'Oriental', 'Fes-Meknes', 'Rabat-Sale-Kenitra',
-                'Beni Mellal-Khenifra', 'Casablanca-Settat', 'Marrakech-Safi', 'Daraa-Tafilelt',
-                'Souss Massa', 'Guelmim-Oued Noun', 'Laayoune-Saguia Hamra', 'Dakhla-Oued Eddahab'
-            ],
-            'population': [3648200, 2283800, 4362900, 4654000, 2590000, 7284400, 4846100, 1632600, 2722000, 486200, 367700, 142800],
-            'accidents': [6237, 4166, 9276, 15226, 5764, 27490, 11264, 2016, 5500, 959, 1137, 63],
-            'victims': [1200, 900, 1400, 2100, 800, 3200, 1600, 450, 950, 200, 300, 20],
-        }
+        data = region_data()
+
+        # Tuiles servies depuis le cache local s'il a été préchargé (python tile_cache.py prefetch --tile-server URL)
+        tile_server = None
+        tiles_path = base_dir.parent.parent / "morocco_tiles.mbtiles"
+        if tiles_path.exists():
+            from tile_cache import Tile_cache, Tile_server
+            self.tile_server = Tile_server(Tile_cache(tiles_path))
+            tile_server = self.tile_server.start()
 
         # Ajouter la carte à x=1401, y=484 avec w=497, h=516
-        self.map_interface = Accidents_Map(self.window, geojson_path, data, x=1401, y=484, width=497, height=516)
+        with phase("carte des accidents"):
+            on_region_click = self.show_region_panel if aggregates is not None else None
+            self.map_interface = Accidents_Map(self.window, geojson_path, data, x=1401, y=484, width=497, height=516,
+                                               tile_server=tile_server, on_region_click=on_region_click)
+        if self.traffic_source:
+            self.map_interface.add_traffic_layer(self.traffic_source)
+
+    #methode pour afficher le panneau détaillé d'une région cliquée sur la carte
+    def show_region_panel(self, region):
+        """Cities, causes and weather of any region, queried from the extract's cube."""
+        # les requêtes du cube prennent quelques ms ; les figures sont rendues par les processus
+        frames = aggregates.region_sheets(region)
+        view = visualizer.with_sheets(frames)
+        panels = [
+            (view.plot_accidents_par_cause_tng, 44, 572, 399, 454),
+            (view.plot_accidents_par_conditions_meteo_dakhla, 465, 572, 473, 453),
+            (view.plot_accidents_par_villes_tng, 958, 572, 399, 454),
+        ]
+        for plot, x, y, w, h in panels:
+            self.display_graph_async(plot, x, y, w, h, key=f"{plot.__name__}:{region}", frames=frames)
+
     def setup_buttons(self):
         """Setup buttons with their images and commands."""
         buttons = [
@@ -138,7 +306,7 @@ class interface:
         ]
 
         for i, (image_name, position, size, command) in enumerate(buttons, start=1):
-            img = PhotoImage(file=self.relative_to_assets(image_name))
+            img = self.ui_assets.button(image_name)
             button = Button(
                 image=img,
                 borderwidth=0,
@@ -152,26 +320,19 @@ class interface:
     #methode pour gérer les clics sur les boutons
     def on_button_click(self, button_id):
         
-        if button_id == 1:
-            self.display_graph_in_ui(visualizer.plot_3d_victimes_dakhla(), 44, 572, 399, 454)
-            self.display_graph_in_ui(visualizer.plot_accidents_par_conditions_meteo_dakhla(), 465, 572, 473, 453)
-            self.display_graph_in_ui(visualizer.plot_accidents_par_categorie_dakhla(), 958, 572, 399, 454)
-        elif button_id == 2:
-            self.display_graph_in_ui(visualizer.plot_accidents_par_categorie_tng(), 44, 572, 399, 454)
-            self.display_graph_in_ui(visualizer.plot_accidents_par_cause_tng(), 465, 572, 473, 453)
-            self.display_graph_in_ui(visualizer.plot_accidents_par_villes_tng(), 958, 572, 399, 454)
-        elif button_id == 3:
-            self.display_graph_in_ui(visualizer.plot_accidents_par_categorie_casa(), 958, 572, 399, 454)
-            self.display_graph_in_ui(visualizer.plot_evolution_des_accidents_casa(),  44, 572, 399, 454)
-            self.display_graph_in_ui(visualizer.plot_accidents_par_jours_casa(),465, 572, 473, 453)
+        if button_id in REGION_PANELS:
+            self.prefetcher.record_click(button_id)
+            for name, x, y, w, h in REGION_PANELS[button_id]:
+                # les panneaux préchargés sont déjà dans png_cache
+                self.display_graph_async(getattr(visualizer, name), x, y, w, h)
         elif button_id == 4:
-            self.display_graph_in_ui(visualizer.plot_evolution_des_accidents(), 27, 151, 622, 380)
+            self.display_graph_async(visualizer.plot_evolution_des_accidents, 27, 151, 622, 380)
         elif button_id == 5:
-            self.display_graph_in_ui(visualizer.plot_accidents_par_categorie(), 1402, 100, 497, 312)
+            self.display_graph_async(visualizer.plot_accidents_par_categorie, 1402, 100, 497, 312)
         elif button_id == 6:
-            self.display_graph_in_ui(visualizer.plot_accidents_par_jours(), 27, 151, 632, 380)
+            self.display_graph_async(visualizer.plot_accidents_par_jours, 27, 151, 632, 380)
         elif button_id == 7:
-            self.display_graph_in_ui(visualizer.plot_victimes_par_localisation_et_gravite(), 1402, 100, 497, 312) 
+            self.display_graph_async(visualizer.plot_victimes_par_localisation_et_gravite, 1402, 100, 497, 312)
         elif button_id == 8:  
             self.open_adm_trafic_map()
 
@@ -181,4 +342,10 @@ class interface:
     def run(self):
         """Run the Tkinter mainloop."""
         self.window.mainloop()
+
+    def close(self):
+        """Stop the render workers and the live map, then close the window."""
+        self.renderer.shutdown()
+        self.live_map.stop()
+        self.window.destroy()
         
@@ -1,7 +1,7 @@
 import sys
 from PySide6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget
 from PySide6.QtWebEngineWidgets import QWebEngineView
-from PySide6.QtCore import QUrl, Qt
+from PySide6.QtCore import QUrl, Qt, QTimer
 
 # Classe pour la fenêtre contenant la carte ADM Trafic 
 class Live_map(QMainWindow):
@@ -17,15 +17,51 @@ class Live_map(QMainWindow):
         self.browser.load(QUrl("https://admtrafic.ma/?map=true"))
         self.setCentralWidget(self.browser)
 
-    # Fonction pour ouvrir la carte ADM Trafic
-    def open_adm_trafic_map():
-        
-        qt_app = QApplication.instance() or QApplication(sys.argv)
+    # Fermer la fenêtre la cache seulement : la page reste chargée pour le prochain clic
+    def closeEvent(self, event):
+        event.ignore()
+        self.hide()
 
-        # Créer et afficher la fenêtre
-        map_window = Live_map()
-        map_window.show()
+    # Centrer la carte de la page si elle expose un objet Leaflet
+    def set_view(self, lat, lon, zoom):
+        self.browser.page().runJavaScript(
+            f"if (window.map && window.map.setView) {{ window.map.setView([{lat}, {lon}], {zoom}); }}"
+        )
 
-        # Si l'application PySide6 n'est pas encore démarrée, démarrer la boucle d'événements
-        if not QApplication.instance().closingDown():
-            qt_app.exec()
\ No newline at end of file
+    def focus(self):
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
+
+# Boucle du processus de la carte : les commandes du tableau de bord arrivent par le pipe
+def run_helper(conn, poll_ms=50):
+    qt_app = QApplication.instance() or QApplication(sys.argv)
+    qt_app.setQuitOnLastWindowClosed(False)
+    # la page est chargée dès le lancement, fenêtre cachée
+    map_window = Live_map()
+    conn.send(("ready",))
+
+    def poll():
+        try:
+            while conn.poll():
+                command, *args = conn.recv()
+                if command == "quit":
+                    qt_app.quit()
+                    return
+                if command == "show":
+                    map_window.show()
+                elif command == "hide":
+                    map_window.hide()
+                elif command == "focus":
+                    map_window.focus()
+                elif command == "set_view":
+                    map_window.set_view(*args)
+        except (EOFError, OSError):
+            # le tableau de bord s'est fermé
+            qt_app.quit()
+
+    timer = QTimer()
+    timer.timeout.connect(poll)
+    timer.start(poll_ms)
+    qt_app.exec()
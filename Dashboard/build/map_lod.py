@@ -0,0 +1,108 @@
+import numpy as np
+import shapely
+from shapely.errors import UnsupportedGEOSVersionError
+
+
+#methode pour convertir une tolérance en pixels en degrés au niveau de zoom donné
+def zoom_tolerance(zoom, pixels=0.5):
+    return 360.0 / (256 * 2 ** zoom) * pixels
+
+
+class Lod_pyramid:
+    """Simplified polygon rings per zoom level for each administrative level.
+
+    Every level ("regions", "provinces", ...) holds one ring set per zoom,
+    simplified with a tolerance of about half a pixel. A level that is a
+    valid polygon coverage (repaired with coverage_clean when shapely and
+    GEOS allow it) is simplified as a coverage, so neighbours keep sharing
+    the same border; otherwise each polygon is simplified on its own.
+    Finer levels can be registered with a loader and a minimum zoom; they
+    are only read and simplified once the map reaches that zoom.
+    """
+
+    def __init__(self, min_zoom=4, max_zoom=14, pixels=0.5):
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.pixels = pixels
+        self.levels = {}
+
+    def add_level(self, name, geometries=None, loader=None, min_zoom=0, max_zoom=None, precompute=False):
+        """Register a level from a GeoSeries, or a loader returning one."""
+        self.levels[name] = {
+            "geometries": geometries,
+            "loader": loader,
+            "min_zoom": min_zoom,
+            "max_zoom": self.max_zoom if max_zoom is None else max_zoom,
+            "prepared": None,
+            "rings": {},
+        }
+        if precompute:
+            for zoom in range(max(min_zoom, self.min_zoom), self.levels[name]["max_zoom"] + 1):
+                self.rings(name, zoom)
+
+    def visible_levels(self, zoom):
+        zoom = self._clamp(zoom)
+        return [name for name, level in self.levels.items() if level["min_zoom"] <= zoom <= level["max_zoom"]]
+
+    def _clamp(self, zoom):
+        return int(min(max(round(zoom), self.min_zoom), self.max_zoom))
+
+    #methode pour obtenir les anneaux (lat, lon) simplifiés d'un niveau à un zoom
+    def rings(self, name, zoom):
+        level = self.levels[name]
+        zoom = self._clamp(zoom)
+        if zoom not in level["rings"]:
+            if level["geometries"] is None:
+                level["geometries"] = level["loader"]()
+            if level["prepared"] is None:
+                level["prepared"] = self._prepare(level["geometries"])
+            level["rings"][zoom] = self._simplify(*level["prepared"], zoom)
+        return level["rings"][zoom]
+
+    #methode pour vérifier (et réparer si possible) que les polygones d'un niveau forment une couverture
+    @staticmethod
+    def _prepare(geometries):
+        names = list(geometries.index)
+        values = np.asarray(geometries, dtype=object)
+        try:
+            if shapely.coverage_is_valid(values):
+                return names, values, True
+            # coverage_clean : shapely >= 2.2 avec GEOS >= 3.14
+            if hasattr(shapely, "coverage_clean"):
+                cleaned = shapely.coverage_clean(values)
+                if shapely.coverage_is_valid(cleaned):
+                    return names, cleaned, True
+        except UnsupportedGEOSVersionError:
+            pass
+        return names, values, False
+
+    def _simplify(self, names, values, coverage, zoom):
+        tolerance = zoom_tolerance(zoom, self.pixels)
+        simplified = None
+        if coverage:
+            try:
+                # chaque frontière commune est simplifiée une seule fois pour les deux polygones (GEOS >= 3.12)
+                simplified = shapely.coverage_simplify(values, tolerance)
+            except UnsupportedGEOSVersionError:
+                pass
+        if simplified is None:
+            simplified = shapely.simplify(values, tolerance, preserve_topology=True)
+
+        result = {}
+        for name, geom in zip(names, simplified):
+            if geom is None or geom.is_empty:
+                continue
+            rings = []
+            for part in shapely.get_parts(geom):
+                # les îlots plus petits qu'un pixel ne sont pas dessinés
+                min_x, min_y, max_x, max_y = part.bounds
+                if max(max_x - min_x, max_y - min_y) < tolerance * 2:
+                    continue
+                coords = shapely.get_coordinates(part.exterior)
+                if len(coords) >= 4:
+                    rings.append([(lat, lon) for lon, lat in coords])
+            result[name] = rings
+        return result
+
+    def vertex_count(self, name, zoom):
+        return sum(len(ring) for rings in self.rings(name, zoom).values() for ring in rings)
@@ -0,0 +1,104 @@
+import multiprocessing
+
+
+#methode exécutée dans le processus de la carte : Qt n'est importé qu'ici
+def _helper_main(conn):
+    from live_map import run_helper
+    run_helper(conn)
+
+
+class Map_process:
+    """The ADM Trafic live map, run in its own process and driven over a pipe.
+
+    The Qt application and its Chromium web view never load in the Tk
+    process. Commands are ("show",), ("hide",), ("focus",),
+    ("set_view", lat, lon, zoom) and ("quit",); the helper keeps its window
+    (and the loaded page) when hidden or closed, so later clicks reuse it.
+    The helper answers ("ready",) once its window exists; if it exits
+    before that (PySide6 or QtWebEngine missing...), it is not restarted.
+    """
+
+    def __init__(self):
+        self.process = None
+        self.conn = None
+        self.ready = False
+        self.error = None
+        self._reported = False
+
+    @property
+    def running(self):
+        return self.process is not None and self.process.is_alive()
+
+    #methode pour lancer le processus (au premier clic ou en préchauffage)
+    def start(self):
+        if self.running:
+            return
+        if self.error is not None:
+            return
+        ctx = multiprocessing.get_context("spawn")
+        self.ready = False
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_helper_main, args=(child_conn,), daemon=True, name="live-map")
+        self.process.start()
+        child_conn.close()
+
+    #methode pour savoir si le processus a démarré, ou s'il est mort avant d'ouvrir sa fenêtre
+    def _check_start(self):
+        if self.process is None or self.ready or self.error is not None:
+            return
+        try:
+            while self.conn.poll():
+                if self.conn.recv() == ("ready",):
+                    self.ready = True
+                    return
+        except (EOFError, OSError):
+            pass
+        if not self.process.is_alive():
+            self.error = f"La carte ADM Trafic n'a pas pu démarrer (code de sortie {self.process.exitcode})"
+            print(self.error)
+
+    def check(self):
+        """Startup error of the helper, returned only the first time it is seen (else None)."""
+        self._check_start()
+        if self.error is None or self._reported:
+            return None
+        self._reported = True
+        return self.error
+
+    def send(self, *command):
+        self._check_start()
+        if self.error is not None:
+            return
+        # le processus a pu être tué : on le relance une fois
+        for _ in range(2):
+            if not self.running:
+                self.start()
+            try:
+                self.conn.send(command)
+                return
+            except OSError:
+                self.process = None
+
+    def show(self):
+        self.send("show")
+
+    def hide(self):
+        self.send("hide")
+
+    def focus(self):
+        self.send("focus")
+
+    def set_view(self, lat, lon, zoom):
+        self.send("set_view", lat, lon, zoom)
+
+    def stop(self, timeout=2.0):
+        if not self.running:
+            return
+        try:
+            self.conn.send(("quit",))
+        except OSError:
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process = None
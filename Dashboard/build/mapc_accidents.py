@@ -1,35 +1,72 @@
 from pathlib import Path
-from tkinter import Tk, Canvas, Entry, Text, Button, PhotoImage
 import pandas as pd
 import numpy as np
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from mpl_toolkits.mplot3d import Axes3D
-import sys
 import tkinter as tk
-import tkintermapview
-import geopandas as gpd
-import matplotlib.cm as cm
 import matplotlib.colors as mcolors
 import matplotlib.pyplot as plt
-from shapely.geometry import Point
 
 colormap = 'rainbow'
+
+# Indicateurs proposés par le sélecteur de la carte : colonne -> libellé
+METRICS = {
+    'accidents': "Accidents",
+    'victims': "Victimes",
+    'rate': "Accidents / 100 000 hab.",
+}
+
+# Couleurs personnalisées pour certaines régions
+custom_colors = {
+    'Casablanca-Settat': '#FF2929',
+    'Tanger-Tetouan-Hoceima': '#78B3CE',
+    'Dakhla-Oued Eddahab': '#ECE852',
+}
+
+#methode pour calculer les couleurs de toutes les régions en un seul appel au colormap
+def region_styles(gdf_map, metric):
+    """{region: (fill color, outline color)} for one metric of the region table."""
+    values = gdf_map[metric].to_numpy(dtype=float)
+    geometries = gdf_map.geometry
+    drawable = ~np.isnan(values) & geometries.notna().to_numpy() & ~geometries.is_empty.to_numpy()
+    if not drawable.any():
+        return {}
+
+    min_val = values[drawable].min()
+    max_val = values[drawable].max()
+    ratios = (values - min_val) / (max_val - min_val) if max_val != min_val else np.zeros_like(values)
+    cmap = plt.colormaps.get(colormap)
+    rgb = np.rint(cmap(np.nan_to_num(ratios))[:, :3] * 255).astype(int)
+
+    styles = {}
+    for region_name, (r, g, b), ok in zip(gdf_map.index, rgb, drawable):
+        if ok:
+            outline_color = "red" if region_name in custom_colors else "black"
+            styles[region_name] = (f"#{r:02x}{g:02x}{b:02x}", outline_color)
+    return styles
+
+
 class Accidents_Map:
     
     #methode pour afficher la carte des accidents
-    def __init__(self, parent, geojson_path, data, x, y, width, height):
+    def __init__(self, parent, geojson_path, data, x, y, width, height, tile_server=None, on_region_click=None):
+        # geopandas et tkintermapview ne sont chargés qu'à la création de la carte
+        import tkintermapview
+
         self.geojson_path = geojson_path
+        self.tile_server = tile_server or "https://a.tile.openstreetmap.org/{z}/{x}/{y}.png"
+        self.on_region_click = on_region_click
         self.df_data = pd.DataFrame(data)
         self.frame = tk.Frame(parent, width=width, height=height, bg="white")
         self.frame.place(x=x, y=y)
 
-        # Charger les données GeoJSON
-        self.gdf_map = gpd.read_file(self.geojson_path)
-        if "region" not in self.gdf_map.columns:
-            raise ValueError("La colonne 'region' est manquante dans le fichier GeoJSON.")
+        # Charger les données GeoJSON et joindre les données
+        from region_table import region_table
+        self.gdf_map = region_table(data, self.geojson_path)
+        self.metric = 'accidents'
 
-        # Joindre les données
-        self.gdf_map = self.gdf_map.set_index("region").join(self.df_data.set_index("region"))
+        # Index spatial des régions pour le survol, construit une seule fois
+        from region_lookup import Region_lookup
+        self.regions = Region_lookup(self.gdf_map)
+        self._hover_index = -1
 
         # Préparer le widget map
         self.map_widget = tkintermapview.TkinterMapView(self.frame, width=width, height=height, corner_radius=0)
@@ -41,74 +78,122 @@ class Accidents_Map:
 
         self.setup_map()
         self.add_legend()
+        self.add_metric_switcher()
         self.map_widget.canvas.bind("<Motion>", self.on_hover)  # Événement de survol
       
     
     def setup_map(self):
-        self.map_widget.set_tile_server("https://a.tile.openstreetmap.org/{z}/{x}/{y}.png")
+        self.map_widget.set_tile_server(self.tile_server)
         self.map_widget.set_position(31.7917, -7.0926)
         self.map_widget.set_zoom(6)
 
-        min_val = self.gdf_map['accidents'].min()
-        max_val = self.gdf_map['accidents'].max()
+        # Style de chaque région (remplissage, contour)
+        self.region_styles = region_styles(self.gdf_map, self.metric)
+
+        # Pyramide de géométries simplifiées, une par niveau de zoom
+        from map_lod import Lod_pyramid
+        self.lod = Lod_pyramid()
+        self.lod.add_level("regions", self.gdf_map.geometry, precompute=True)
+        self.polygons = {}
+        self._drawn_zoom = None
+        # le widget passe par draw_zoom à chaque changement de niveau (molette, boutons, set_zoom)
+        draw_zoom = self.map_widget.draw_zoom
+        def on_zoom():
+            draw_zoom()
+            self.frame.after_idle(self._zoom_changed)
+        self.map_widget.draw_zoom = on_zoom
+        self._zoom_changed()
+
+    def set_metric(self, metric):
+        """Recolor the drawn regions for another metric, without redrawing them."""
+        self.metric = metric
+        self.region_styles = region_styles(self.gdf_map, metric)
+        canvas = self.map_widget.canvas
+        for polygon in self.polygons.get("regions", []):
+            fill_color = self.region_styles.get(polygon.name, (None, None))[0]
+            polygon.fill_color = fill_color
+            if polygon.canvas_polygon is not None:
+                canvas.itemconfig(polygon.canvas_polygon, fill=fill_color or "")
+        self.gradient_label.config(text=f"Low   {METRICS[metric]}   High")
+
+    #methode pour ajouter le sélecteur d'indicateur
+    def add_metric_switcher(self):
+        metrics = [metric for metric in METRICS if metric in self.gdf_map.columns]
+        labels = {METRICS[metric]: metric for metric in metrics}
+        self.metric_var = tk.StringVar(self.frame, METRICS[self.metric])
+        menu = tk.OptionMenu(self.frame, self.metric_var, *labels, command=lambda label: self.set_metric(labels[label]))
+        menu.config(bg="white", font=("Arial", 8), highlightthickness=0)
+        menu.place(relx=0.02, rely=0.02, anchor=tk.NW)
+
+    #methode pour redessiner les polygones quand le zoom change
+    def _zoom_changed(self):
+        zoom = self.lod._clamp(self.map_widget.zoom)
+        if zoom != self._drawn_zoom:
+            self._drawn_zoom = zoom
+            self._draw_levels(zoom)
+
+    def _draw_levels(self, zoom):
+        visible = self.lod.visible_levels(zoom)
+        for level in list(self.polygons):
+            if level not in visible:
+                for polygon in self.polygons.pop(level):
+                    polygon.delete()
+        for level in visible:
+            for polygon in self.polygons.pop(level, []):
+                polygon.delete()
+            self.polygons[level] = []
+            for region_name, rings in self.lod.rings(level, zoom).items():
+                fill_color, outline_color = self.region_styles.get(region_name, (None, "gray40"))
+                if level == "regions" and region_name not in self.region_styles:
+                    continue
+                command = None
+                if level == "regions" and self.on_region_click is not None:
+                    command = lambda polygon, region=region_name: self.on_region_click(region)
+                for ring in rings:
+                    self.polygons[level].append(self._draw_polygon(ring, fill_color, outline_color, command, region_name))
+
+    def add_admin_level(self, name, geojson_path, name_column, min_zoom):
+        """Register finer boundaries (e.g. provinces), loaded once zoomed in."""
+        def load():
+            import geopandas as gpd
+            return gpd.read_file(geojson_path).set_index(name_column).geometry
+        self.lod.add_level(name, loader=load, min_zoom=min_zoom)
+        self._drawn_zoom = None
+        self._zoom_changed()
+
+    def add_traffic_layer(self, source, **options):
+        """Draw live traffic events from a stream (tcp://, ws:// or a .jsonl file)."""
+        from traffic_feed import Traffic_feed, Traffic_layer
+        self.traffic = Traffic_layer(self.map_widget, Traffic_feed(source).start(), **options)
+        return self.traffic
 
-        cmap = plt.colormaps.get(colormap)
-
-        # Couleurs personnalisées pour certaines régions
-        custom_colors = {
-            'Casablanca-Settat': '#FF2929',  
-            'Tanger-Tetouan-Hoceima': '#78B3CE',  
-            'Dakhla-Oued Eddahab': '#ECE852',  
-        }
-
-        for idx, row in self.gdf_map.iterrows():
-            geom = row['geometry']
-            if geom is None or geom.is_empty:
-                continue
-
-            
-            region_name = idx
-            outline_color = "black"
-            if region_name in custom_colors:
-                outline_color = "red"
-    
-            accidents = row['accidents']
-            if pd.isnull(accidents):
-                continue
-            ratio = (accidents - min_val) / (max_val - min_val) if max_val != min_val else 0
-            color_rgba = cmap(ratio)
-            color_hex = mcolors.to_hex(color_rgba)
-
-            if geom.geom_type == 'Polygon':
-                self._draw_polygon(geom, color_hex, outline_color)
-            elif geom.geom_type == 'MultiPolygon':
-                for poly in geom.geoms:
-                    self._draw_polygon(poly, color_hex, outline_color)
     #methode pour dessiner un polygone
-    def _draw_polygon(self, polygon, fill_color, outline_color = "black"):
-        coords = list(polygon.exterior.coords)
-        coords_latlon = [(y, x) for x, y in coords]
-        self.map_widget.set_polygon(coords_latlon, fill_color=fill_color, border_width=0.6, outline_color=outline_color)
+    def _draw_polygon(self, coords_latlon, fill_color, outline_color = "black", command=None, name=None):
+        return self.map_widget.set_polygon(coords_latlon, fill_color=fill_color, border_width=0.6, outline_color=outline_color, command=command, name=name)
     
     #methode pour afficher les informations de survol
     def on_hover(self, event):
         x_hover, y_hover = event.x, event.y
         lat, lon = self.map_widget.convert_canvas_coords_to_decimal_coords(x_hover, y_hover)
 
-        # Afficher les coordonnées de survol
-        print(f"Hover: Canvas({x_hover}, {y_hover}) -> LatLon({lat}, {lon})")
-
-        point = Point(lon, lat)
-        for idx, row in self.gdf_map.iterrows():
-            geom = row['geometry']
-            if geom is not None and not geom.is_empty and geom.contains(point):
-                region_name = idx
-                population = row.get('population', 'N/A')
-                accidents = row.get('accidents', 'N/A')
-                victims = row.get('victims', 'N/A')
-                self.update_hover_label(region_name, population, accidents, victims, x_hover, y_hover)
-                return  # Sortir de la boucle si un match est trouvé
-        self.hover_label.place_forget()  # Masquer le label si aucun match n'est trouvé
+        # Toujours dans la même région : on déplace seulement le label
+        index = self._hover_index
+        if index >= 0 and self.regions.contains(index, lat, lon):
+            self.hover_label.place(x=x_hover + 1400, y=y_hover + 448)
+            return
+
+        index = self.regions.index_at(lat, lon)
+        self._hover_index = index
+        if index < 0:
+            self.hover_label.place_forget()  # Masquer le label si aucun match n'est trouvé
+            return
+
+        region_name = self.regions.names[index]
+        row = self.gdf_map.loc[region_name]
+        population = row.get('population', 'N/A')
+        accidents = row.get('accidents', 'N/A')
+        victims = row.get('victims', 'N/A')
+        self.update_hover_label(region_name, population, accidents, victims, x_hover, y_hover)
 
     def update_hover_label(self, region_name, population, accidents, victims, x, y):
         text = (
@@ -136,8 +221,8 @@ class Accidents_Map:
             color = mcolors.to_hex(cmap(ratio))
             gradient_canvas.create_line(i, 0, i, 20, fill=color)
 
-        gradient_label = tk.Label(legend_frame, text="Low   Accidents   High", bg="white", font=("Arial", 8))
-        gradient_label.pack()
+        self.gradient_label = tk.Label(legend_frame, text=f"Low   {METRICS[self.metric]}   High", bg="white", font=("Arial", 8))
+        self.gradient_label.pack()
 
     def run(self):
         self.root.mainloop()
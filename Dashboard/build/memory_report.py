@@ -0,0 +1,120 @@
+from pathlib import Path
+import argparse
+import gc
+import json
+import os
+import tracemalloc
+
+import matplotlib
+matplotlib.use("Agg")
+
+base_dir = Path(__file__).parent
+file_path = base_dir.parent.parent / "accident_de_route_2017.xlsx"
+
+
+#methode pour lire la mémoire résidente du processus (None si indisponible)
+def rss_bytes():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def sheet_report(store):
+    """[(sheet, rows, bytes, lean bytes)] for the sheets loaded in `store`."""
+    from sheet_store import lean_frame
+    sizes = store.memory_usage()
+    rows = []
+    for name, df in store.frames.items():
+        rows.append((name, len(df), sizes[name], int(lean_frame(df).memory_usage(deep=True).sum())))
+    return rows
+
+
+def figure_report(visualizer, names, w=640, h=480):
+    """[(chart, peak bytes, retained bytes, RSS delta)] while building and drawing each chart.
+
+    The peak is the tracemalloc high-water mark during plot + rasterisation;
+    retained is what is still allocated once the figure is closed.
+    """
+    import matplotlib.pyplot as plt
+    from panel_cache import render_png
+
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    rows = []
+    try:
+        for name in names:
+            gc.collect()
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            rss = rss_bytes()
+            figure = getattr(visualizer, name)()
+            render_png(figure, w, h)
+            rss_after = rss_bytes()
+            plt.close(figure)
+            _, peak = tracemalloc.get_traced_memory()
+            gc.collect()
+            current, _ = tracemalloc.get_traced_memory()
+            delta = rss_after - rss if rss is not None and rss_after is not None else None
+            rows.append((name, peak - before, current - before, delta))
+    finally:
+        if started:
+            tracemalloc.stop()
+    return rows
+
+
+def _mb(n):
+    return "n/d" if n is None else f"{n / 1e6:9.3f}"
+
+
+def print_report(sheets, figures, rss=None):
+    print(f"{'feuille':<40} {'lignes':>8} {'Mo':>9} {'Mo lean':>9}")
+    for name, n, size, lean in sheets:
+        print(f"{name[:40]:<40} {n:>8} {_mb(size)} {_mb(lean)}")
+    print(f"{'total':<40} {sum(r[1] for r in sheets):>8} {_mb(sum(r[2] for r in sheets))} {_mb(sum(r[3] for r in sheets))}")
+    print()
+    print(f"{'graphique':<44} {'pic Mo':>9} {'gardé Mo':>9} {'RSS Mo':>9}")
+    for name, peak, retained, delta in figures:
+        print(f"{name[:44]:<44} {_mb(peak)} {_mb(retained)} {_mb(delta)}")
+    if rss is not None:
+        print(f"\nMémoire résidente du processus : {_mb(rss).strip()} Mo")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mémoire occupée par les feuilles et par chaque graphique")
+    parser.add_argument("--workbook", default=str(file_path), help="classeur à mesurer")
+    parser.add_argument("--lean", action="store_true", help="types réduits (catégories, entiers 32 bits)")
+    parser.add_argument("--extract", metavar="FICHIER", help="extrait par accident (CSV ou Parquet) à agréger")
+    parser.add_argument("--charts", nargs="*", help="graphiques à mesurer (tous par défaut)")
+    parser.add_argument("--json", metavar="FICHIER", help="écrire aussi le rapport en JSON")
+    args = parser.parse_args()
+
+    from visualisation import Visualisation_des_accidents, CHART_SHEETS
+    visualizer = Visualisation_des_accidents(args.workbook)
+    visualizer.sheets.load_all()
+    if args.lean:
+        visualizer.sheets.set_lean()
+    if args.extract:
+        from ingestion import load_extract, extract_tag
+        from region_table import REGION_DATA
+        aggregates = load_extract(args.extract, progress=None)
+        population = dict(zip(REGION_DATA['region'], REGION_DATA['population']))
+        visualizer.sheets.override(aggregates.to_sheets(population), extract_tag(args.extract))
+
+    sheets = sheet_report(visualizer.sheets)
+    figures = figure_report(visualizer, args.charts or list(CHART_SHEETS))
+    print_report(sheets, figures, rss_bytes())
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            "lean": args.lean,
+            "rss": rss_bytes(),
+            "sheets": [dict(zip(("sheet", "rows", "bytes", "lean_bytes"), row)) for row in sheets],
+            "figures": [dict(zip(("chart", "peak", "retained", "rss_delta"), row)) for row in figures],
+        }, indent=2, ensure_ascii=False), encoding="utf-8")
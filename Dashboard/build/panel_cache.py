@@ -0,0 +1,113 @@
+from collections import OrderedDict
+from pathlib import Path
+import io
+
+
+#methode pour rendre une figure avec Agg à la taille exacte de l'emplacement
+def render_png(figure, w, h, fmt="png"):
+    figure.set_size_inches(w / figure.dpi, h / figure.dpi, forward=False)
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format=fmt, dpi=figure.dpi)
+    return buffer.getvalue()
+
+
+class Panel_cache:
+    """PNG bitmaps of rendered panels, in memory and on disk.
+
+    Entries are keyed by chart name, pixel size and the version of the data
+    the chart reads (`version_of(name)`), so an edited sheet never shows a
+    stale bitmap and the other charts keep theirs. With cache_dir None the
+    bitmaps are only kept in memory.
+    """
+
+    def __init__(self, cache_dir, version_of, max_bytes=64 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.version_of = version_of
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()
+        self.nbytes = 0
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._prune()
+        except OSError as e:
+            print(f"Cache des panneaux sur disque désactivé : {e}")
+            self.cache_dir = None
+
+    def _file(self, name, w, h, version):
+        return self.cache_dir / f"{name}_{w}x{h}_{version[:16]}.png"
+
+    #methode pour supprimer les images d'une ancienne version des données (toutes, ou celles des graphiques donnés)
+    def _prune(self, names=None):
+        versions = {}
+        for path in self.cache_dir.glob("*.png"):
+            parts = path.stem.rsplit("_", 2)
+            if len(parts) != 3:
+                continue
+            name, _, version = parts
+            if names is not None and name not in names:
+                continue
+            if name not in versions:
+                versions[name] = self.version_of(name)[:16]
+            if version != versions[name]:
+                path.unlink(missing_ok=True)
+
+    def invalidate(self, names):
+        """Drop the bitmaps of these charts (their sheets changed); the others stay."""
+        names = set(names)
+        for key in [key for key in self.memory if key[0] in names]:
+            self.nbytes -= len(self.memory.pop(key))
+        if self.cache_dir is not None:
+            try:
+                self._prune(names)
+            except OSError as e:
+                print(f"Impossible de nettoyer le cache des panneaux : {e}")
+
+    def get(self, name, w, h):
+        version = self.version_of(name)
+        key = (name, w, h, version)
+        png = self.memory.get(key)
+        if png is not None:
+            self.memory.move_to_end(key)
+            return png
+        if self.cache_dir is None:
+            return None
+        try:
+            png = self._file(name, w, h, version).read_bytes()
+        except OSError:
+            return None
+        self._remember(key, png)
+        return png
+
+    def has(self, name, w, h):
+        """Whether a bitmap of the current data is cached (no read)."""
+        version = self.version_of(name)
+        if (name, w, h, version) in self.memory:
+            return True
+        return self.cache_dir is not None and self._file(name, w, h, version).exists()
+
+    def put(self, name, w, h, png, version=None):
+        """Cache png; `version` is the data version it was rendered from (current by default)."""
+        version = version or self.version_of(name)
+        self._remember((name, w, h, version), png)
+        if self.cache_dir is not None:
+            try:
+                self._file(name, w, h, version).write_bytes(png)
+            except OSError as e:
+                print(f"Impossible d'écrire le panneau {name} : {e}")
+        return png
+
+    def render(self, name, figure, w, h):
+        """Render figure at w x h pixels and cache the PNG bytes."""
+        return self.put(name, w, h, render_png(figure, w, h))
+
+    def _remember(self, key, png):
+        old = self.memory.pop(key, None)
+        if old is not None:
+            self.nbytes -= len(old)
+        self.memory[key] = png
+        self.nbytes += len(png)
+        while self.nbytes > self.max_bytes and len(self.memory) > 1:
+            _, evicted = self.memory.popitem(last=False)
+            self.nbytes -= len(evicted)
@@ -0,0 +1,93 @@
+from pathlib import Path
+import json
+import time
+
+
+class Panel_prefetcher:
+    """Renders the region panels in the background while the user is idle.
+
+    Panels are warmed one chart at a time through the render pool, most
+    clicked panel first (click counts are kept in a small JSON file), into
+    the same Panel_cache the button clicks read. Nothing is submitted while
+    the user has interacted within quiet_ms, and warming stops once
+    max_bytes of PNGs have been rendered.
+    """
+
+    def __init__(self, window, renderer, cache, panels, history_path=None,
+                 max_bytes=32 * 1024 * 1024, quiet_ms=1500, poll_ms=250):
+        self.window = window
+        self.renderer = renderer
+        self.cache = cache
+        self.panels = panels
+        self.history_path = Path(history_path) if history_path else None
+        self.max_bytes = max_bytes
+        self.quiet_ms = quiet_ms
+        self.poll_ms = poll_ms
+        # taille des images préparées ici, pour le plafond de mémoire
+        self.warmed = {}
+        self.nbytes = 0
+        # graphiques dont le rendu a échoué : pas resoumis avant un changement des données
+        self.failed = set()
+        self.clicks = self._load_history()
+        self.last_input = time.perf_counter()
+        self._busy = False
+
+    def _load_history(self):
+        try:
+            return {int(k): v for k, v in json.loads(self.history_path.read_text(encoding="utf-8")).items()}
+        except (AttributeError, OSError, ValueError):
+            return {}
+
+    def start(self):
+        # toute interaction met le préchargement en pause
+        for sequence in ("<Motion>", "<ButtonPress>", "<KeyPress>", "<MouseWheel>"):
+            self.window.bind_all(sequence, self._on_input, add="+")
+        self.window.after(self.poll_ms, self._tick)
+
+    def _on_input(self, event=None):
+        self.last_input = time.perf_counter()
+
+    #methode pour donner la file des graphiques à préparer, par ordre de priorité
+    def queue(self):
+        order = sorted(self.panels, key=lambda panel: -self.clicks.get(panel, 0))
+        return [chart for panel in order for chart in self.panels[panel]
+                if (chart[0], chart[3], chart[4]) not in self.failed
+                and not self.cache.has(chart[0], chart[3], chart[4])]
+
+    def _tick(self):
+        idle_ms = (time.perf_counter() - self.last_input) * 1000
+        if not self._busy and idle_ms >= self.quiet_ms and self.nbytes < self.max_bytes:
+            waiting = self.queue()
+            if waiting:
+                name, _, _, w, h = waiting[0]
+                self._busy = True
+                # version des données au lancement : un rendu fini après un rechargement garde l'ancienne
+                version = self.cache.version_of(name)
+                self.renderer.submit(name, w, h, lambda png: self._store(name, w, h, version, png),
+                                     on_error=lambda error: self._failed(name, w, h))
+        self.window.after(self.poll_ms, self._tick)
+
+    def _failed(self, name, w, h):
+        self._busy = False
+        self.failed.add((name, w, h))
+
+    def _store(self, name, w, h, version, png):
+        self._busy = False
+        self.cache.put(name, w, h, png, version=version)
+        self.nbytes += len(png) - self.warmed.get((name, w, h), 0)
+        self.warmed[(name, w, h)] = len(png)
+
+    def record_click(self, panel):
+        self.clicks[panel] = self.clicks.get(panel, 0) + 1
+        if self.history_path is not None:
+            try:
+                self.history_path.write_text(json.dumps(self.clicks), encoding="utf-8")
+            except OSError:
+                pass
+
+    def invalidate(self, charts):
+        """Forget the failures and byte counts of these charts (their sheets changed)."""
+        charts = set(charts)
+        self.failed = {key for key in self.failed if key[0] not in charts}
+        for key in [key for key in self.warmed if key[0] in charts]:
+            self.nbytes -= self.warmed.pop(key)
@@ -0,0 +1,169 @@
+from collections import deque
+from pathlib import Path
+import cProfile
+import functools
+import time
+
+# Traceur actif (None tant que --perf n'est pas demandé : aucune méthode n'est enveloppée)
+_tracer = None
+
+
+class Perf_tracer:
+    """Durations of dashboard operations, kept in a fixed-size ring buffer.
+
+    Hooks are installed by wrapping methods when tracing is enabled, so the
+    code runs unmodified otherwise. Each sample is (phase, name, start,
+    duration in ms); phases are excel, figure, draw, tk, display, click,
+    map and lag (Tk event loop delay).
+    """
+
+    def __init__(self, size=20_000):
+        self.samples = deque(maxlen=size)
+        self._patched = []
+        self.profiler = None
+
+    def record(self, phase, name, start, duration_ms):
+        self.samples.append((phase, name, start, duration_ms))
+
+    #methode pour envelopper des méthodes d'une classe avec un chronomètre
+    def instrument(self, cls, names, phase):
+        for name in names:
+            original = cls.__dict__.get(name)
+            if original is None:
+                continue
+            label = f"{cls.__name__}.{name}"
+
+            @functools.wraps(original)
+            def timed(*args, __original=original, __label=label, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return __original(*args, **kwargs)
+                finally:
+                    self.record(phase, __label, start, (time.perf_counter() - start) * 1000)
+            setattr(cls, name, timed)
+            self._patched.append((cls, name, original))
+
+    def uninstall(self):
+        for cls, name, original in reversed(self._patched):
+            setattr(cls, name, original)
+        self._patched = []
+
+    def stats(self):
+        """{phase: (count, p50 ms, p95 ms, max ms)} over the ring buffer."""
+        by_phase = {}
+        for phase, _, _, duration in list(self.samples):
+            by_phase.setdefault(phase, []).append(duration)
+        result = {}
+        for phase, durations in by_phase.items():
+            durations.sort()
+            n = len(durations)
+            result[phase] = (n, durations[n // 2], durations[min(n - 1, int(0.95 * n))], durations[-1])
+        return result
+
+    def slowest(self, top=5):
+        return sorted(self.samples, key=lambda sample: -sample[3])[:top]
+
+    #methode pour démarrer ou arrêter cProfile et écrire le fichier .prof
+    def toggle_profiler(self, out_dir):
+        if self.profiler is None:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+            print("cProfile démarré")
+            return None
+        self.profiler.disable()
+        path = Path(out_dir) / f"dashboard_{time.strftime('%Y%m%d_%H%M%S')}.prof"
+        self.profiler.dump_stats(path)
+        self.profiler = None
+        print(f"Profil écrit : {path} (snakeviz, flameprof ou gprof2dot)")
+        return path
+
+
+class Lag_probe:
+    """Measures how late Tk runs a callback scheduled every interval_ms."""
+
+    def __init__(self, window, tracer, interval_ms=100):
+        self.window = window
+        self.tracer = tracer
+        self.interval_ms = interval_ms
+        self._expected = time.perf_counter() + interval_ms / 1000
+        window.after(interval_ms, self._tick)
+
+    def _tick(self):
+        now = time.perf_counter()
+        self.tracer.record("lag", "after", self._expected, max(0.0, (now - self._expected) * 1000))
+        self._expected = now + self.interval_ms / 1000
+        self.window.after(self.interval_ms, self._tick)
+
+
+class Perf_overlay:
+    """On-screen table of p50/p95 per phase, refreshed while visible."""
+
+    def __init__(self, window, tracer, refresh_ms=500):
+        import tkinter as tk
+        self.window = window
+        self.tracer = tracer
+        self.refresh_ms = refresh_ms
+        self.label = tk.Label(window, justify="left", anchor="nw", font=("Courier", 9),
+                              bg="#000000", fg="#00FF66", padx=6, pady=4)
+        self.visible = False
+
+    def toggle(self, event=None):
+        self.visible = not self.visible
+        if self.visible:
+            self.label.place(x=10, y=10)
+            self.label.lift()
+            self._refresh()
+        else:
+            self.label.place_forget()
+
+    def _refresh(self):
+        if not self.visible:
+            return
+        lines = [f"{'phase':<8} {'n':>6} {'p50':>8} {'p95':>8} {'max':>8}"]
+        for phase, (n, p50, p95, worst) in sorted(self.tracer.stats().items()):
+            lines.append(f"{phase:<8} {n:>6} {p50:>8.1f} {p95:>8.1f} {worst:>8.1f}")
+        lines.append("")
+        lines.append("plus lents :")
+        for phase, name, _, duration in self.tracer.slowest():
+            lines.append(f"  {duration:8.1f} ms  {name[:40]}")
+        self.label.config(text="\n".join(lines))
+        self.label.lift()
+        self.window.after(self.refresh_ms, self._refresh)
+
+
+def enable(size=20_000):
+    """Wrap the dashboard's hot methods with timers (--perf)."""
+    global _tracer
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from visualisation import Visualisation_des_accidents
+    from sheet_store import Sheet_store
+    from canvas_manager import Canvas_manager
+    from mapc_accidents import Accidents_Map
+    from traffic_feed import Traffic_layer
+
+    _tracer = Perf_tracer(size)
+    plots = [name for name in vars(Visualisation_des_accidents) if name.startswith("plot_")]
+    _tracer.instrument(Sheet_store, ["_load"], "excel")
+    _tracer.instrument(Visualisation_des_accidents, plots, "figure")
+    _tracer.instrument(FigureCanvasAgg, ["draw"], "draw")
+    _tracer.instrument(Canvas_manager, ["show_live", "show_bitmap", "_fit"], "tk")
+    _tracer.instrument(Accidents_Map, ["on_hover", "_draw_levels", "set_metric"], "map")
+    _tracer.instrument(Traffic_layer, ["_apply", "draw"], "map")
+    return _tracer
+
+
+def instrument_interface(cls):
+    """Time the interface's display and click handlers when tracing is on."""
+    if _tracer is not None:
+        _tracer.instrument(cls, ["display_graph_in_ui", "display_graph_async", "show_region_panel"], "display")
+        _tracer.instrument(cls, ["on_button_click"], "click")
+
+
+def attach(window, profile_dir="."):
+    """Start the lag probe and bind F10 (overlay) and F11 (cProfile dump)."""
+    if _tracer is None:
+        return
+    Lag_probe(window, _tracer)
+    overlay = Perf_overlay(window, _tracer)
+    window.bind_all("<F10>", overlay.toggle)
+    window.bind_all("<F11>", lambda event: _tracer.toggle_profiler(profile_dir))
@@ -0,0 +1,86 @@
+import numpy as np
+import shapely
+from shapely.strtree import STRtree
+
+
+class Region_lookup:
+    """Point-in-region queries over the region geometries of a GeoDataFrame.
+
+    Geometries are prepared and indexed once in an STRtree; a bounding box
+    test rejects points outside every region before the tree is queried.
+    """
+
+    def __init__(self, gdf):
+        keep = [geom is not None and not geom.is_empty for geom in gdf.geometry]
+        self.names = np.asarray(gdf.index[keep], dtype=object)
+        self.geometries = np.asarray(gdf.geometry[keep], dtype=object)
+        shapely.prepare(self.geometries)
+        self.tree = STRtree(self.geometries)
+        self.bounds = shapely.total_bounds(self.geometries)
+
+    def _in_bounds(self, lats, lons):
+        min_x, min_y, max_x, max_y = self.bounds
+        return (lons >= min_x) & (lons <= max_x) & (lats >= min_y) & (lats <= max_y)
+
+    def contains(self, index, lat, lon):
+        """True if region number `index` contains the point."""
+        return bool(shapely.contains_xy(self.geometries[index], lon, lat))
+
+    #methode pour trouver l'indice de la région d'un point (-1 si aucune)
+    def index_at(self, lat, lon):
+        if not self._in_bounds(lat, lon):
+            return -1
+        for index in self.tree.query(shapely.Point(lon, lat)):
+            if self.contains(index, lat, lon):
+                return int(index)
+        return -1
+
+    def region_at(self, lat, lon):
+        """Name of the region containing (lat, lon), or None."""
+        index = self.index_at(lat, lon)
+        return self.names[index] if index >= 0 else None
+
+    #methode vectorisée : indice de région pour des tableaux de coordonnées
+    def indices_at(self, lats, lons):
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        result = np.full(lats.shape, -1, dtype=np.int64)
+        inside = np.flatnonzero(self._in_bounds(lats, lons))
+        if len(inside) == 0:
+            return result
+        x, y = lons[inside], lats[inside]
+
+        # grille régulière : l'arbre donne les régions candidates par cellule,
+        # sans créer de géométrie par point
+        min_x, min_y, max_x, max_y = self.bounds
+        size = max(max_x - min_x, max_y - min_y) / (8 * np.sqrt(len(self.geometries))) or 1.0
+        columns = int((max_x - min_x) // size) + 1
+        cell = ((y - min_y) // size).astype(np.int64) * columns + ((x - min_x) // size).astype(np.int64)
+        cells, point_cell = np.unique(cell, return_inverse=True)
+        cell_x = min_x + (cells % columns) * size
+        cell_y = min_y + (cells // columns) * size
+        boxes = shapely.box(cell_x, cell_y, cell_x + size, cell_y + size)
+        box_idx, region_idx = self.tree.query(boxes)
+
+        # couples (point, région candidate) en une passe
+        order = np.argsort(box_idx, kind="stable")
+        box_idx, region_idx = box_idx[order], region_idx[order]
+        counts = np.bincount(box_idx, minlength=len(cells))
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        per_point = counts[point_cell]
+        pair_point = np.repeat(np.arange(len(x)), per_point)
+        offsets = np.arange(len(pair_point)) - np.repeat(np.cumsum(per_point) - per_point, per_point)
+        pair_region = region_idx[starts[point_cell[pair_point]] + offsets]
+
+        hit = shapely.contains_xy(self.geometries[pair_region], x[pair_point], y[pair_point])
+        # en cas de chevauchement, la première région trouvée l'emporte
+        result[inside[pair_point[hit][::-1]]] = pair_region[hit][::-1]
+        return result
+
+    def regions_at(self, lats, lons):
+        """Vectorized region_at: array of region names (None outside)."""
+        indices = self.indices_at(lats, lons)
+        names = np.empty(indices.shape, dtype=object)
+        found = indices >= 0
+        names[found] = self.names[indices[found]]
+        return names
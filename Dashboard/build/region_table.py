@@ -0,0 +1,30 @@
+from pathlib import Path
+import pandas as pd
+
+base_dir = Path(__file__).parent
+geojson_path = base_dir.parent.parent / "morocco_regions.geojson"
+
+# Chiffres par région affichés sur la carte
+REGION_DATA = {
+    'region': [
+        'Tanger-Tetouan-Hoceima', 'Oriental', 'Fes-Meknes', 'Rabat-Sale-Kenitra',
+        'Beni Mellal-Khenifra', 'Casablanca-Settat', 'Marrakech-Safi', 'Daraa-Tafilelt',
+        'Souss Massa', 'Guelmim-Oued Noun', 'Laayoune-Saguia Hamra', 'Dakhla-Oued Eddahab'
+    ],
+    'population': [3648200, 2283800, 4362900, 4654000, 2590000, 7284400, 4846100, 1632600, 2722000, 486200, 367700, 142800],
+    'accidents': [6237, 4166, 9276, 15226, 5764, 27490, 11264, 2016, 5500, 959, 1137, 63],
+    'victims': [1200, 900, 1400, 2100, 800, 3200, 1600, 450, 950, 200, 300, 20],
+}
+
+
+def region_table(data=REGION_DATA, path=geojson_path):
+    """Region geometries joined with the map figures, as Accidents_Map builds them."""
+    import geopandas as gpd
+
+    gdf_map = gpd.read_file(path)
+    if "region" not in gdf_map.columns:
+        raise ValueError("La colonne 'region' est manquante dans le fichier GeoJSON.")
+    gdf_map = gdf_map.set_index("region").join(pd.DataFrame(data).set_index("region"))
+    if {'accidents', 'population'} <= set(gdf_map.columns):
+        gdf_map['rate'] = gdf_map['accidents'] / gdf_map['population'] * 100_000
+    return gdf_map
@@ -0,0 +1,61 @@
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+
+from chart_render import init_worker, render_chart
+
+
+class Render_scheduler:
+    """Renders charts in a process pool and hands the PNGs back on the Tk thread.
+
+    Finished jobs are collected by a short after() poll, so callbacks always
+    run on the Tk thread and never block it on a worker.
+    """
+
+    def __init__(self, window, file_path, workers=None, poll_ms=30, overrides=None, overrides_tag=None, lean=False):
+        self.window = window
+        self.poll_ms = poll_ms
+        self.jobs = []
+        self._polling = False
+        # version des données attendue par les rendus (mise à jour après un rechargement)
+        self.data_version = None
+        # "spawn" : on ne duplique pas l'interpréteur Tk dans les processus de rendu
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(str(file_path), overrides, overrides_tag, lean),
+        )
+
+    #methode pour lancer le rendu d'un graphique en arrière-plan
+    def submit(self, name, w, h, callback, on_error=None, frames=None):
+        future = self.executor.submit(render_chart, name, w, h, "png", self.data_version, frames)
+        self.jobs.append((future, callback, on_error))
+        if not self._polling:
+            self._polling = True
+            self.window.after(self.poll_ms, self._poll)
+        return future
+
+    def _poll(self):
+        # un seul appel à done() par tâche : une tâche qui se termine pendant le tri n'est pas perdue
+        done, pending = [], []
+        for job in self.jobs:
+            (done if job[0].done() else pending).append(job)
+        self.jobs = pending
+        for future, callback, on_error in done:
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is None:
+                callback(future.result())
+            else:
+                print(f"Erreur de rendu en arrière-plan : {error!r}")
+                if on_error is not None:
+                    on_error(error)
+        if self.jobs:
+            self.window.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
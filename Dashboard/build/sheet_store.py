@@ -0,0 +1,442 @@
+from pathlib import Path
+import hashlib
+import json
+import os
+import pickle
+import re
+import time
+import zipfile
+from xml.etree import ElementTree
+import numpy as np
+import pandas as pd
+
+# A incrémenter si le format du cache disque change
+CACHE_VERSION = 2
+
+
+#nettoyage appliqué une seule fois à chaque feuille, avant de la donner aux graphiques
+def _sans_total(df):
+    return df[df['CATEGORIE'] != 'TOTAL']
+
+
+def _accid_popul_region(df):
+    return df.iloc[:12, :]
+
+
+def _acci_casa(df):
+    df.columns = ['City', 'Total_Accidents']
+    df = df.dropna()
+    df = df.assign(Total_Accidents=pd.to_numeric(df['Total_Accidents'], errors='coerce'))
+    return df.dropna(subset=['Total_Accidents'])
+
+
+def _lesroutes_casa(df):
+    df.columns = [
+        "Type_Reseau",
+        "Circulation",
+        "Accidents_Non_Mortels",
+        "Accidents_Mortels",
+    ]
+    df = df.dropna()
+    df = df[~df["Type_Reseau"].str.contains("TOTAL", na=False)]
+    return df.assign(**{
+        col: pd.to_numeric(df[col], errors='coerce')
+        for col in ["Circulation", "Accidents_Non_Mortels", "Accidents_Mortels"]
+    })
+
+
+def _sheet7(df):
+    df.columns = ['City', 'Accid_N_Mort', 'Accid_Mort', 'Total_Accidents']
+    df = df[['City', 'Total_Accidents']].dropna()
+    return df.assign(Total_Accidents=pd.to_numeric(df['Total_Accidents'], errors='coerce'))
+
+
+# Feuilles utilisées par le tableau de bord : options de lecture et nettoyage
+SHEETS = {
+    "Accident_corporels": ({}, _sans_total),
+    "Evolution_accident_2008_2020": ({}, None),
+    "ACCID_VICTIME_PAR_JOUR": ({}, None),
+    "VICTIME_PAR_CATEGORIE_DUSAGERS ": ({}, None),
+    "Victimes_2016_2017": ({}, None),
+    "accid_popul_region": ({}, _accid_popul_region),
+    "ACCI_CASA": ({}, _acci_casa),
+    "CAUSE_ACC_CASA": ({}, None),
+    "LESROUTES_CASA": ({"skiprows": 1}, _lesroutes_casa),
+    "Sheet1": ({}, None),
+    "Sheet2": ({}, None),
+    "Sheet7": ({}, _sheet7),
+    "ACCID_AGLO_DAKHLA_OUED_EDDAHAB": ({}, _sans_total),
+    "ACCID_METEO_DAKHLA": ({}, None),
+}
+
+
+#methode pour calculer l'empreinte du contenu du classeur
+def content_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+# cellule de texte partagé : <c ... t="s"><v>indice</v>
+_SHARED_CELL = re.compile(rb'<(?:\w+:)?c [^>]*t="s"[^>]*>\s*<(?:\w+:)?v>(\d+)</')
+
+
+def sheet_hashes(path):
+    """Content hash of every sheet, read from the xlsx XML without parsing cells.
+
+    Shared-string cells are hashed by their text rather than their index,
+    so editing one sheet does not change the hash of the others.
+    """
+    with zipfile.ZipFile(path) as archive:
+        workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        rels = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+        targets = {rel.get("Id"): rel.get("Target") for rel in rels}
+        strings = []
+        if "xl/sharedStrings.xml" in archive.namelist():
+            for item in ElementTree.fromstring(archive.read("xl/sharedStrings.xml")).iter(f"{_MAIN_NS}si"):
+                strings.append("".join(t.text or "" for t in item.iter(f"{_MAIN_NS}t")))
+
+        hashes = {}
+        for sheet in workbook.iter(f"{_MAIN_NS}sheet"):
+            target = targets[sheet.get(f"{_REL_NS}id")]
+            xml = archive.read(target.lstrip("/") if target.startswith("/") else "xl/" + target)
+            digest = hashlib.sha256()
+            pos = 0
+            for match in _SHARED_CELL.finditer(xml):
+                digest.update(xml[pos:match.start(1)])
+                digest.update(strings[int(match.group(1))].encode())
+                pos = match.end(1)
+            digest.update(xml[pos:])
+            hashes[sheet.get("name")] = digest.hexdigest()
+    return hashes
+
+
+def lean_frame(df, max_ratio=0.5):
+    """Same frame with smaller dtypes (mode --lean).
+
+    Text columns become categoricals when labels repeat enough for it to
+    save memory (distinct values <= max_ratio of the rows); numeric
+    columns holding only whole numbers become int32 (int64 beyond), other
+    floats are left in float64 so computed percentages do not change.
+    """
+    if not df.columns.is_unique:
+        return df
+    columns = {}
+    for column in df.columns:
+        values = df[column]
+        if values.dtype == object:
+            if len(values) and values.nunique(dropna=False) <= max_ratio * len(values):
+                columns[column] = values.astype("category")
+        elif pd.api.types.is_bool_dtype(values.dtype):
+            continue
+        elif pd.api.types.is_numeric_dtype(values.dtype) and values.notna().all():
+            numbers = values.to_numpy()
+            if len(numbers) and (numbers % 1 == 0).all():
+                info = np.iinfo(np.int32)
+                fits = info.min <= numbers.min() and numbers.max() <= info.max
+                columns[column] = values.astype(np.int32 if fits else np.int64)
+    if not columns:
+        return df
+    # copie superficielle : les colonnes inchangées ne sont pas dupliquées
+    lean = df.copy(deep=False)
+    for column, values in columns.items():
+        lean[column] = values
+    return lean
+
+
+def _cache_file_name(sheet_name):
+    slug = re.sub(r"[^\w]+", "_", sheet_name).strip("_")
+    return f"{slug}_{hashlib.md5(sheet_name.encode()).hexdigest()[:8]}.pkl"
+
+
+class Sheet_store:
+    """Parsed and cleaned workbook sheets, shared by every plot method.
+
+    Raw sheets are also kept in a disk cache next to the workbook, keyed by
+    its size, mtime and content hash, so a warm start skips openpyxl.
+    """
+
+    def __init__(self, file_path, cache_dir=None, use_cache=True, write_cache=True):
+        self.file_path = Path(file_path)
+        self.frames = {}
+        self.timings = {}
+        self._excel = None
+        self.use_cache = use_cache
+        # les processus de rendu lisent le cache mais ne l'écrivent jamais (seul le processus Tk le tient à jour)
+        self.write_cache = write_cache
+        self.cache_dir = Path(cache_dir) if cache_dir else self.file_path.with_name(self.file_path.name + ".cache")
+        self.data_version = None
+        self._cache_checked = False
+        self.overridden = set()
+        self.override_tag = None
+        self.sheet_versions = None
+        self._stat = None
+        self.lean = False
+
+    #methode pour valider le cache disque contre l'empreinte du classeur
+    def _check_cache(self):
+        if self._cache_checked:
+            return
+        self._cache_checked = True
+        stat = self.file_path.stat()
+        self._stat = (stat.st_size, stat.st_mtime_ns)
+        manifest_path = self.cache_dir / "manifest.json"
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            manifest = {}
+
+        same_version = manifest.get("version") == CACHE_VERSION and manifest.get("pandas") == pd.__version__
+        if same_version and manifest.get("size") == stat.st_size and manifest.get("mtime_ns") == stat.st_mtime_ns:
+            self.data_version = manifest["sha256"]
+            self.sheet_versions = manifest.get("sheets")
+            return
+
+        if not self.write_cache:
+            # cache périmé et en lecture seule : les feuilles sont lues dans le classeur
+            self.use_cache = False
+            self.data_version = content_hash(self.file_path)
+            self.sheet_versions = sheet_hashes(self.file_path)
+            return
+
+        # taille ou date différente : seul le hash du contenu fait foi
+        self.data_version = content_hash(self.file_path)
+        cached_versions = manifest.get("sheets", {}) if same_version else {}
+        if same_version and manifest.get("sha256") == self.data_version:
+            self.sheet_versions = cached_versions
+        else:
+            # seules les feuilles dont le contenu a changé sont relues
+            self.sheet_versions = sheet_hashes(self.file_path)
+            for sheet_name in SHEETS:
+                if cached_versions.get(sheet_name) != self.sheet_versions.get(sheet_name):
+                    (self.cache_dir / _cache_file_name(sheet_name)).unlink(missing_ok=True)
+        self._write_manifest(self._manifest(stat))
+
+    def _manifest(self, stat):
+        return {
+            "version": CACHE_VERSION,
+            "pandas": pd.__version__,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": self.data_version,
+            "sheets": self.sheet_versions,
+        }
+
+    def _write_manifest(self, manifest):
+        if not self.write_cache:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_dir / f"manifest.json.{os.getpid()}.tmp"
+            tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+            os.replace(tmp, self.cache_dir / "manifest.json")
+        except OSError as e:
+            print(f"Cache des feuilles désactivé : {e}")
+            self.use_cache = False
+
+    def version(self):
+        """Content hash of the workbook, used to key derived caches."""
+        if self.data_version is None:
+            if self.use_cache:
+                self._check_cache()
+            else:
+                self.data_version = content_hash(self.file_path)
+        if self.override_tag is not None:
+            return hashlib.sha256(f"{self.data_version}|{self.override_tag}".encode()).hexdigest()
+        return self.data_version
+
+    def fingerprint(self, sheet_names):
+        """Hash of the cleaned contents of the given sheets.
+
+        Built from the values, index, column names and dtypes, so a frame
+        parsed from the workbook and the same frame read back from the
+        pickle cache hash alike (their pickles can differ).
+        """
+        digest = hashlib.sha256()
+        for sheet_name in sheet_names:
+            df = self.get(sheet_name)
+            digest.update(sheet_name.encode())
+            digest.update(repr([(str(column), str(dtype)) for column, dtype in df.dtypes.items()]).encode())
+            digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    def override(self, frames, tag):
+        """Serve these cleaned frames instead of the workbook sheets.
+
+        Used to feed the charts from another source (see ingestion.py);
+        sheets not in `frames` still come from the workbook. `tag`
+        identifies the source so version() changes with it.
+        """
+        if self.lean:
+            frames = {name: lean_frame(df) for name, df in frames.items()}
+        self.frames.update(frames)
+        self.overridden.update(frames)
+        self.override_tag = tag
+
+    #methode pour lire une feuille brute depuis le cache disque
+    def _read_cached(self, sheet_name):
+        try:
+            return pd.read_pickle(self.cache_dir / _cache_file_name(sheet_name))
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+            return None
+
+    def _write_cached(self, sheet_name, df):
+        if not self.write_cache:
+            return
+        path = self.cache_dir / _cache_file_name(sheet_name)
+        # nom temporaire propre au processus : deux écritures simultanées ne se mélangent pas
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            df.to_pickle(tmp)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Impossible d'écrire le cache de {sheet_name!r} : {e}")
+
+    #methode pour ouvrir le classeur une seule fois (une seule passe openpyxl)
+    def _open(self):
+        if self._stat is None:
+            stat = self.file_path.stat()
+            self._stat = (stat.st_size, stat.st_mtime_ns)
+        if self._excel is None:
+            start = time.perf_counter()
+            self._excel = pd.ExcelFile(self.file_path, engine="openpyxl")
+            self.timings["<ouverture>"] = time.perf_counter() - start
+        return self._excel
+
+    #methode pour lire et nettoyer une feuille
+    def _load(self, sheet_name):
+        options, clean = SHEETS.get(sheet_name, ({}, None))
+        start = time.perf_counter()
+        df = None
+        if self.use_cache:
+            self._check_cache()
+            df = self._read_cached(sheet_name)
+        if df is None:
+            df = self._open().parse(sheet_name, **options)
+            if self.use_cache:
+                self._write_cached(sheet_name, df)
+        if clean is not None:
+            df = clean(df)
+        if self.lean:
+            df = lean_frame(df)
+        self.timings[sheet_name] = time.perf_counter() - start
+        return df
+
+    def set_lean(self):
+        """Switch to smaller dtypes, converting the sheets already loaded."""
+        self.lean = True
+        self.frames = {name: lean_frame(df) for name, df in self.frames.items()}
+
+    def memory_usage(self):
+        """{sheet: bytes} of the loaded frames, strings included."""
+        return {name: int(df.memory_usage(deep=True).sum()) for name, df in self.frames.items()}
+
+    def get(self, sheet_name):
+        """Return the cleaned sheet, loading it on first access."""
+        if sheet_name not in self.frames:
+            self.frames[sheet_name] = self._load(sheet_name)
+        return self.frames[sheet_name]
+
+    __getitem__ = get
+
+    def load_all(self):
+        """Load every dashboard sheet in one pass over the workbook."""
+        for sheet_name in SHEETS:
+            self.get(sheet_name)
+        self.close()
+        return self.frames
+
+    def read_changes(self):
+        """Parse the sheets whose content changed on disk, without touching the store.
+
+        Safe to run off the Tk thread. Returns None when the file is
+        unchanged, otherwise what apply_changes() publishes. Overridden
+        sheets are not read.
+        """
+        stat = self.file_path.stat()
+        if (stat.st_size, stat.st_mtime_ns) == self._stat:
+            return None
+        hashes = sheet_hashes(self.file_path)
+        previous = self.sheet_versions or {}
+        changed = [name for name in SHEETS if hashes.get(name) != previous.get(name)]
+        raw, frames = {}, {}
+        to_read = [name for name in changed if name not in self.overridden]
+        if to_read:
+            # classeur ouvert à part : celui du magasin peut servir au thread Tk pendant ce temps
+            with pd.ExcelFile(self.file_path, engine="openpyxl") as excel:
+                for sheet_name in to_read:
+                    options, clean = SHEETS[sheet_name]
+                    df = raw[sheet_name] = excel.parse(sheet_name, **options)
+                    if clean is not None:
+                        df = clean(df)
+                    if self.lean:
+                        df = lean_frame(df)
+                    frames[sheet_name] = df
+        return {
+            "stat": stat,
+            "sheets": hashes,
+            "sha256": content_hash(self.file_path),
+            "changed": changed,
+            "raw": raw,
+            "frames": frames,
+        }
+
+    def apply_changes(self, changes):
+        """Publish what read_changes() parsed; returns the changed sheet names.
+
+        Called from the thread that owns the store (the Tk thread in the
+        dashboard): frames, versions and the disk cache are updated here.
+        """
+        if changes is None:
+            return []
+        stat = changes["stat"]
+        self.close()
+        self._stat = (stat.st_size, stat.st_mtime_ns)
+        self.sheet_versions = changes["sheets"]
+        self.data_version = changes["sha256"]
+        if self.use_cache and self.write_cache:
+            self._cache_checked = True
+            for sheet_name in changes["changed"]:
+                (self.cache_dir / _cache_file_name(sheet_name)).unlink(missing_ok=True)
+            for sheet_name, df in changes["raw"].items():
+                self._write_cached(sheet_name, df)
+            self._write_manifest(self._manifest(stat))
+        self.frames.update(changes["frames"])
+        return changes["changed"]
+
+    def reload(self):
+        """Re-read only the sheets whose content changed on disk.
+
+        Returns the names of the changed sheets. Unchanged sheets keep their
+        frames and disk cache entries; overridden sheets are left alone.
+        """
+        return self.apply_changes(self.read_changes())
+
+    def sheets_version(self, sheet_names):
+        """Hash of the given sheets' contents, to key caches of what is drawn from them."""
+        self.version()
+        if self.sheet_versions is None:
+            self.sheet_versions = sheet_hashes(self.file_path)
+        digest = hashlib.sha256()
+        for sheet_name in sheet_names:
+            digest.update(f"{sheet_name}|{self.sheet_versions.get(sheet_name)}|".encode())
+            if sheet_name in self.overridden:
+                digest.update(f"{self.override_tag}|".encode())
+        return digest.hexdigest()
+
+    def close(self):
+        if self._excel is not None:
+            self._excel.close()
+            self._excel = None
+
+    #methode pour afficher les temps de chargement par feuille
+    def report_timings(self):
+        total = sum(self.timings.values())
+        print(f"Chargement du classeur : {total * 1000:.1f} ms")
+        for sheet_name, seconds in sorted(self.timings.items(), key=lambda item: -item[1]):
+            print(f"  {sheet_name:<40} {seconds * 1000:8.1f} ms")
+        return dict(self.timings)
@@ -0,0 +1,100 @@
+from contextlib import contextmanager, nullcontext
+import sys
+import time
+
+# Profil actif (None tant que --profile-startup n'est pas demandé)
+_profile = None
+
+
+class Startup_profile:
+    """Import times and init phases recorded while the dashboard starts."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.imports = {}
+        self.phases = []
+        self._stack = []
+
+    #methode pour chronométrer l'exécution de chaque module importé
+    def install(self):
+        sys.meta_path.insert(0, _Timing_finder(self))
+
+    def uninstall(self):
+        sys.meta_path[:] = [f for f in sys.meta_path if not isinstance(f, _Timing_finder)]
+
+    def _timed(self, name, exec_module):
+        def timed_exec_module(module):
+            self._stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                return exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - start
+                children = self._stack.pop()
+                if self._stack:
+                    self._stack[-1] += elapsed
+                self.imports[name] = (elapsed, elapsed - children)
+        return timed_exec_module
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, start - self.start, time.perf_counter() - start))
+
+    #methode pour afficher la répartition des temps de démarrage
+    def report(self, top=20):
+        total = time.perf_counter() - self.start
+        print(f"\n=== Démarrage : {total * 1000:.0f} ms jusqu'à la première image ===")
+        print("Phases :")
+        for name, offset, seconds in self.phases:
+            print(f"  +{offset * 1000:7.0f} ms  {name:<40} {seconds * 1000:8.1f} ms")
+        print(f"Imports les plus coûteux (propre / cumulé, {len(self.imports)} modules) :")
+        slowest = sorted(self.imports.items(), key=lambda item: -item[1][1])[:top]
+        for name, (inclusive, own) in slowest:
+            print(f"  {name:<45} {own * 1000:8.1f} ms {inclusive * 1000:9.1f} ms")
+        sys.stdout.flush()
+
+
+class _Timing_finder:
+    def __init__(self, profile):
+        self.profile = profile
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        loader = spec.loader
+        # les importeurs intégrés/gelés sont des classes partagées : on ne les touche pas
+        if loader is not None and not isinstance(loader, type) and hasattr(loader, "exec_module"):
+            loader.exec_module = self.profile._timed(name, loader.exec_module)
+        return spec
+
+
+def enable():
+    """Start recording imports and phases for --profile-startup."""
+    global _profile
+    _profile = Startup_profile()
+    _profile.install()
+    return _profile
+
+
+def phase(name):
+    """Time a block as a startup phase when profiling is enabled."""
+    return _profile.phase(name) if _profile is not None else nullcontext()
+
+
+def report_when_idle(window):
+    """Print the report once Tk has painted the first frame."""
+    if _profile is not None:
+        def done():
+            _profile.uninstall()
+            _profile.report()
+        window.after_idle(done)
@@ -0,0 +1,168 @@
+from pathlib import Path
+import argparse
+import numpy as np
+import pandas as pd
+
+from accident_records import (
+    LATITUDE, LONGITUDE, DATE, REGION, VILLE, CATEGORIE, GRAVITE, CAUSE, METEO,
+    TUES, BLESSES_GRAVES, BLESSES_LEGERS, MORTEL, NON_MORTEL,
+)
+from region_table import REGION_DATA, geojson_path
+
+base_dir = Path(__file__).parent
+file_path = base_dir.parent.parent / "accident_de_route_2017.xlsx"
+
+# Nombre d'accidents corporels en 2017 (feuille Evolution_accident_2008_2020)
+ACCIDENTS_2017 = 89375
+CAUSES = [
+    "Vitesse excessive", "Non-respect de la priorité", "Mauvais état des routes", "Embouteillages",
+    "Changements soudains de vitesse", "Distraction au volant", "Consommation d'alcool ou drogues",
+    "Faible visibilité", "Défaut mécanique", "Non-respect des distances de sécurité",
+]
+METEOS = ["Ensoleillé", "Nuageux", "Pluie", "Brouillard", "Vent fort", "Tempête de sable"]
+
+
+#methode pour multiplier les effectifs d'une feuille brute sans toucher aux en-têtes ni aux années
+def _scale_sheet(raw, scale, rng):
+    body = raw.iloc[1:]
+    for column in raw.columns:
+        values = pd.to_numeric(body[column], errors="coerce")
+        numbers = values.dropna()
+        if numbers.empty or numbers.between(1900, 2100).all():
+            continue
+        counts = (values > 1) & (values % 1 == 0)
+        noise = rng.uniform(0.9, 1.1, len(values))
+        scaled = np.rint(values * scale * noise)
+        raw.loc[body.index[counts.to_numpy()], column] = scaled[counts.to_numpy()]
+    return raw
+
+
+def write_workbook(out_path, scale=1.0, cities=0, seed=0, source=file_path):
+    """Copy of the workbook with every sheet kept cell for cell, counts scaled.
+
+    Integer counts below the header row are multiplied by `scale` (with
+    +/-10 % noise); year columns, labels and fractions are left as is.
+    `cities` appends synthetic rows to the per-city sheets (Sheet7,
+    ACCI_CASA) to grow the charts with the most bars.
+    """
+    rng = np.random.default_rng(seed)
+    excel = pd.ExcelFile(source, engine="openpyxl")
+    with pd.ExcelWriter(out_path, engine="openpyxl") as writer:
+        for sheet_name in excel.sheet_names:
+            raw = _scale_sheet(excel.parse(sheet_name, header=None).astype(object), scale, rng)
+            if cities and sheet_name in ("Sheet7", "ACCI_CASA"):
+                non_mortels = rng.integers(1, 500, cities) * max(scale, 1)
+                mortels = rng.integers(0, 30, cities) * max(scale, 1)
+                names = [f"VILLE SYNTHETIQUE {i + 1}" for i in range(cities)]
+                if sheet_name == "Sheet7":
+                    extra = pd.DataFrame({0: names, 1: non_mortels, 2: mortels, 3: non_mortels + mortels})
+                else:
+                    extra = pd.DataFrame({0: names, 1: non_mortels + mortels})
+                raw = pd.concat([raw, extra], ignore_index=True)
+            raw.to_excel(writer, sheet_name=sheet_name, header=False, index=False)
+    excel.close()
+    return Path(out_path)
+
+
+#methode pour tirer des points à l'intérieur de chaque région (échantillonnage par rejet)
+def _region_points(per_region, rng):
+    import shapely
+    from region_table import region_table
+
+    gdf_map = region_table()
+    pools = {}
+    for region_name, geom in gdf_map.geometry.items():
+        min_x, min_y, max_x, max_y = geom.bounds
+        points = np.empty((0, 2))
+        while len(points) < per_region:
+            lon = rng.uniform(min_x, max_x, per_region * 2)
+            lat = rng.uniform(min_y, max_y, per_region * 2)
+            inside = shapely.contains_xy(geom, lon, lat)
+            points = np.vstack([points, np.column_stack([lat[inside], lon[inside]])])
+        pools[region_name] = points[:per_region]
+    return pools
+
+
+def accident_chunks(scale=1.0, chunk_size=500_000, seed=0, with_region=True, years=(2008, 2020)):
+    """Synthetic per-accident rows (accident_records schema), chunk by chunk.
+
+    The 2017 volume times `scale` rows are produced, spread over the
+    regions in proportion to REGION_DATA; coordinates fall inside the
+    region polygons so Region_lookup finds them again.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(ACCIDENTS_2017 * scale)
+    regions = np.array(REGION_DATA["region"], dtype=object)
+    weights = np.array(REGION_DATA["accidents"], dtype=float)
+    weights /= weights.sum()
+    pools = _region_points(20_000, rng)
+    cities = {region: np.array([f"{region.split('-')[0].upper()} {i + 1}" for i in range(25)], dtype=object)
+              for region in regions}
+    start = np.datetime64(f"{years[0]}-01-01")
+    days = int((np.datetime64(f"{years[1] + 1}-01-01") - start).astype(int))
+
+    for offset in range(0, total, chunk_size):
+        n = min(chunk_size, total - offset)
+        region_codes = rng.choice(len(regions), n, p=weights)
+        lat = np.empty(n)
+        lon = np.empty(n)
+        city = np.empty(n, dtype=object)
+        for code, region in enumerate(regions):
+            rows = np.flatnonzero(region_codes == code)
+            picked = pools[region][rng.integers(0, len(pools[region]), len(rows))]
+            lat[rows], lon[rows] = picked[:, 0], picked[:, 1]
+            city[rows] = rng.choice(cities[region], len(rows))
+        mortel = rng.random(n) < 0.045
+        chunk = pd.DataFrame({
+            LATITUDE: lat,
+            LONGITUDE: lon,
+            DATE: start + rng.integers(0, days, n).astype("timedelta64[D]"),
+            VILLE: city,
+            CATEGORIE: np.where(rng.random(n) < 0.72, "EN AGGLOMERATION", "HORS AGGLOMERATION"),
+            GRAVITE: np.where(mortel, MORTEL, NON_MORTEL),
+            CAUSE: rng.choice(CAUSES, n),
+            METEO: rng.choice(METEOS, n, p=[0.6, 0.15, 0.12, 0.05, 0.05, 0.03]),
+            TUES: np.where(mortel, rng.integers(1, 3, n), 0),
+            BLESSES_GRAVES: rng.poisson(0.12, n),
+            BLESSES_LEGERS: rng.poisson(1.3, n),
+        })
+        if with_region:
+            chunk.insert(2, REGION, regions[region_codes])
+        yield chunk
+
+
+def write_accidents(out_path, scale=1.0, chunk_size=500_000, seed=0, with_region=True):
+    """Write the synthetic per-accident rows to CSV or Parquet, chunk by chunk."""
+    out_path = Path(out_path)
+    parquet = out_path.suffix.lower() in (".parquet", ".pq")
+    writer = None
+    for i, chunk in enumerate(accident_chunks(scale, chunk_size, seed, with_region)):
+        if parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(out_path, table.schema)
+            writer.write_table(table)
+        else:
+            chunk.to_csv(out_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    if writer is not None:
+        writer.close()
+    return out_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génération de données synthétiques (classeur et extrait par accident)")
+    parser.add_argument("kind", choices=["workbook", "accidents"])
+    parser.add_argument("out", help="fichier de sortie (.xlsx, .csv ou .parquet)")
+    parser.add_argument("--scale", type=float, default=1.0, help="facteur par rapport au volume 2017")
+    parser.add_argument("--cities", type=int, default=0, help="villes synthétiques ajoutées (classeur)")
+    parser.add_argument("--no-region", action="store_true", help="extrait sans colonne REGION (à déduire des coordonnées)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.kind == "workbook":
+        write_workbook(args.out, args.scale, args.cities, args.seed)
+    else:
+        write_accidents(args.out, args.scale, seed=args.seed, with_region=not args.no_region)
+    print(f"Écrit : {args.out}")
@@ -0,0 +1,258 @@
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import argparse
+import math
+import sqlite3
+import threading
+import time
+import urllib.request
+
+TILE_SERVER = "https://a.tile.openstreetmap.org/{z}/{x}/{y}.png"
+USER_AGENT = "Interactive-Dashboard-for-Road-Accident-Analysis tile prefetch"
+
+# Boîte englobante du Maroc : (lat nord, lon ouest), (lat sud, lon est)
+MOROCCO_BOUNDS = ((36.0, -17.5), (20.7, -0.9))
+
+
+#methode pour convertir une position en numéro de tuile OSM
+def tile_xy(lat, lon, zoom):
+    n = 2 ** zoom
+    x = int((lon + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tiles_in_bounds(bounds, zoom_min, zoom_max):
+    (north, west), (south, east) = bounds
+    for zoom in range(zoom_min, zoom_max + 1):
+        x0, y0 = tile_xy(north, west, zoom)
+        x1, y1 = tile_xy(south, east, zoom)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                yield zoom, x, y
+
+
+class Tile_cache:
+    """Map tiles in an MBTiles (SQLite) file with a size cap and LRU eviction."""
+
+    def __init__(self, path, max_bytes=512 * 1024 * 1024):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS tiles (
+                zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER,
+                tile_data BLOB, last_used REAL,
+                PRIMARY KEY (zoom_level, tile_column, tile_row)
+            );
+            CREATE INDEX IF NOT EXISTS tiles_last_used ON tiles (last_used);
+        """)
+        self._db.executemany(
+            "INSERT OR IGNORE INTO metadata (name, value) VALUES (?, ?)",
+            [("name", "Maroc"), ("format", "png"), ("scheme", "tms")],
+        )
+        self._db.commit()
+        self.nbytes = self._db.execute("SELECT COALESCE(SUM(LENGTH(tile_data)), 0) FROM tiles").fetchone()[0]
+        self._touched = 0
+
+    # MBTiles numérote les lignes en TMS (origine en bas)
+    @staticmethod
+    def _row(zoom, y):
+        return 2 ** zoom - 1 - y
+
+    def get(self, zoom, x, y):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                (zoom, x, self._row(zoom, y)),
+            ).fetchone()
+            if row is not None:
+                self._db.execute(
+                    "UPDATE tiles SET last_used=? WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                    (time.time(), zoom, x, self._row(zoom, y)),
+                )
+                # dates d'utilisation enregistrées par lots
+                self._touched += 1
+                if self._touched >= 100:
+                    self._db.commit()
+                    self._touched = 0
+        return None if row is None else row[0]
+
+    def has(self, zoom, x, y):
+        with self._lock:
+            return self._db.execute(
+                "SELECT 1 FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                (zoom, x, self._row(zoom, y)),
+            ).fetchone() is not None
+
+    def put(self, zoom, x, y, data):
+        with self._lock:
+            old = self._db.execute(
+                "SELECT LENGTH(tile_data) FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                (zoom, x, self._row(zoom, y)),
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO tiles (zoom_level, tile_column, tile_row, tile_data, last_used) VALUES (?, ?, ?, ?, ?)",
+                (zoom, x, self._row(zoom, y), sqlite3.Binary(data), time.time()),
+            )
+            self.nbytes += len(data) - (old[0] if old else 0)
+            if self.nbytes > self.max_bytes:
+                self._evict()
+
+    #methode pour supprimer les tuiles les moins récemment utilisées
+    def _evict(self):
+        target = self.max_bytes * 0.9
+        rows = self._db.execute(
+            "SELECT zoom_level, tile_column, tile_row, LENGTH(tile_data) FROM tiles ORDER BY last_used"
+        )
+        to_delete = []
+        for zoom, x, row, size in rows:
+            if self.nbytes <= target:
+                break
+            to_delete.append((zoom, x, row))
+            self.nbytes -= size
+        self._db.executemany(
+            "DELETE FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?", to_delete
+        )
+
+    def commit(self):
+        with self._lock:
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+    def tile_count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM tiles").fetchone()[0]
+
+    #methode pour télécharger une zone une fois pour toutes
+    def prefetch(self, tile_server, bounds=MOROCCO_BOUNDS, zoom_min=5, zoom_max=10, workers=2):
+        """Download every tile of `bounds` from `tile_server` ({z}/{x}/{y} URL).
+
+        There is deliberately no default server: the OpenStreetMap tile
+        servers forbid bulk downloads, so point this at a provider or a
+        server of your own that allows them.
+        """
+        if "tile.openstreetmap.org" in tile_server:
+            raise ValueError("Les serveurs de tuiles OpenStreetMap interdisent le téléchargement en masse")
+        wanted = [tile for tile in tiles_in_bounds(bounds, zoom_min, zoom_max) if not self.has(*tile)]
+        print(f"{len(wanted)} tuiles à télécharger (zooms {zoom_min}-{zoom_max})")
+
+        def fetch(tile):
+            zoom, x, y = tile
+            url = tile_server.replace("{z}", str(zoom)).replace("{x}", str(x)).replace("{y}", str(y))
+            request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    return tile, response.read()
+            except OSError as e:
+                print(f"  échec {zoom}/{x}/{y} : {e}")
+                return tile, None
+
+        done = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for tile, data in pool.map(fetch, wanted):
+                if data is None:
+                    continue
+                self.put(*tile, data)
+                done += 1
+                if done % 200 == 0:
+                    self.commit()
+                    print(f"  {done}/{len(wanted)}")
+        self.commit()
+        print(f"Cache : {self.tile_count()} tuiles, {self.nbytes / 1e6:.1f} Mo")
+
+
+class Tile_server:
+    """Local HTTP tile server reading from a Tile_cache.
+
+    tkintermapview only knows URL tile servers, so the map points at this
+    server. Misses are fetched upstream only when allow_network is set.
+    """
+
+    def __init__(self, cache, allow_network=False, tile_server=TILE_SERVER, port=0):
+        self.cache = cache
+        self.allow_network = allow_network
+        self.tile_server = tile_server
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}/{{z}}/{{x}}/{{y}}.png"
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self.url
+
+    def stop(self):
+        self.httpd.shutdown()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                try:
+                    zoom, x, y = (int(part) for part in self.path.strip("/").removesuffix(".png").split("/"))
+                except ValueError:
+                    self.send_error(400)
+                    return
+                data = server.cache.get(zoom, x, y)
+                if data is None and server.allow_network:
+                    data = server._fetch(zoom, x, y)
+                if data is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "image/png")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _fetch(self, zoom, x, y):
+        url = self.tile_server.replace("{z}", str(zoom)).replace("{x}", str(x)).replace("{y}", str(y))
+        try:
+            request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+            with urllib.request.urlopen(request, timeout=10) as response:
+                data = response.read()
+        except OSError:
+            return None
+        self.cache.put(zoom, x, y, data)
+        self.cache.commit()
+        return data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cache de tuiles hors ligne pour la carte des accidents")
+    parser.add_argument("command", choices=["prefetch", "info"])
+    parser.add_argument("--path", default=str(Path(__file__).parent.parent.parent / "morocco_tiles.mbtiles"))
+    parser.add_argument("--zoom-min", type=int, default=5)
+    parser.add_argument("--zoom-max", type=int, default=10)
+    parser.add_argument("--max-mb", type=int, default=512)
+    parser.add_argument("--tile-server", help="URL {z}/{x}/{y} d'un serveur autorisant le préchargement (obligatoire pour prefetch)")
+    args = parser.parse_args()
+    if args.command == "prefetch" and not args.tile_server:
+        parser.error("prefetch demande --tile-server (les serveurs OpenStreetMap interdisent le téléchargement en masse)")
+
+    cache = Tile_cache(args.path, max_bytes=args.max_mb * 1024 * 1024)
+    if args.command == "prefetch":
+        try:
+            cache.prefetch(args.tile_server, zoom_min=args.zoom_min, zoom_max=args.zoom_max)
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        print(f"{args.path} : {cache.tile_count()} tuiles, {cache.nbytes / 1e6:.1f} Mo")
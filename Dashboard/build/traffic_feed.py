@@ -0,0 +1,318 @@
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import math
+import threading
+import time
+
+import numpy as np
+
+# Couleur des marqueurs par type d'événement
+KIND_COLORS = {
+    "accident": "#FF2929",
+    "bouchon": "#FF9900",
+    "travaux": "#FFD700",
+    "fermeture": "#8B0000",
+}
+DEFAULT_COLOR = "#1E90FF"
+
+
+#methode pour vérifier qu'une coordonnée est un nombre fini (ni texte, ni booléen, ni NaN)
+def _is_coordinate(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+class Traffic_feed:
+    """Streaming traffic events read by an asyncio client in a background thread.
+
+    Sources: "tcp://host:port" (JSON lines), "ws://..." (needs the websockets
+    package) or a .jsonl file replayed at `rate` events per second. Events
+    are {"id", "op": "add"|"move"|"remove", "lat", "lon", "kind"}; only the
+    latest event per id is kept until the map takes them, so bursts are
+    coalesced before they reach Tk.
+    """
+
+    def __init__(self, source, rate=1000, reconnect_s=2.0):
+        self.source = str(source)
+        self.rate = rate
+        self.reconnect_s = reconnect_s
+        self.pending = {}
+        self.received = 0
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name="traffic-feed")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        self._task = self._loop.create_task(self._consume())
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    #methode pour lire la source, en se reconnectant si le flux est coupé
+    async def _consume(self):
+        while True:
+            try:
+                if self.source.startswith("tcp://"):
+                    await self._read_tcp()
+                elif self.source.startswith(("ws://", "wss://")):
+                    await self._read_websocket()
+                else:
+                    await self._replay(Path(self.source))
+                    return
+            except Exception as e:
+                # connexion fermée, ligne trop longue, module absent... (CancelledError n'est pas une Exception)
+                print(f"Flux trafic interrompu ({e!r}), nouvelle tentative dans {self.reconnect_s} s")
+            await asyncio.sleep(self.reconnect_s)
+
+    async def _read_tcp(self):
+        host, port = self.source[len("tcp://"):].rsplit(":", 1)
+        reader, writer = await asyncio.open_connection(host, int(port))
+        try:
+            while line := await reader.readline():
+                self._receive(line)
+        finally:
+            writer.close()
+
+    async def _read_websocket(self):
+        import websockets
+        async with websockets.connect(self.source) as socket:
+            async for message in socket:
+                for line in message.splitlines():
+                    self._receive(line)
+
+    #methode pour rejouer un fichier JSONL au débit demandé (banc d'essai hors ligne)
+    async def _replay(self, path, batch=100):
+        start = time.monotonic()
+        with open(path, "rb") as lines:
+            for n, line in enumerate(lines, 1):
+                self._receive(line)
+                if n % batch == 0:
+                    delay = n / self.rate - (time.monotonic() - start)
+                    await asyncio.sleep(max(delay, 0))
+
+    def _receive(self, line):
+        try:
+            event = json.loads(line)
+            key = event["id"]
+        except (ValueError, KeyError, TypeError):
+            return
+        # un événement sans position valide ferait échouer tout le lot dans _apply
+        if event.get("op") != "remove" and not (_is_coordinate(event.get("lat")) and _is_coordinate(event.get("lon"))):
+            return
+        with self._lock:
+            self.received += 1
+            previous = self.pending.get(key)
+            if previous is not None and previous.get("op") == "add":
+                # un marqueur ajouté puis retiré avant l'affichage n'est jamais dessiné
+                if event.get("op") == "remove":
+                    del self.pending[key]
+                    return
+                # ajouté puis déplacé : un seul ajout, à la dernière position
+                event = {**previous, **event, "op": "add"}
+            self.pending[key] = event
+
+    def take(self, limit):
+        """Remove and return at most `limit` coalesced events (oldest ids first)."""
+        with self._lock:
+            if len(self.pending) <= limit:
+                events, self.pending = self.pending, {}
+                return list(events.values())
+            keys = list(self.pending)[:limit]
+            return [self.pending.pop(key) for key in keys]
+
+
+class Traffic_layer:
+    """Markers of a Traffic_feed drawn on a TkinterMapView canvas.
+
+    The coalesced events are applied by an after() tick at most `fps` times
+    a second, with at most `max_ops` canvas operations per tick; the rest
+    waits for the next tick. Markers are plain canvas ovals tagged
+    "traffic" and "marker" (the widget lifts "marker" above new tiles and
+    polygons): a pan moves them all with one canvas.move, and only a zoom
+    reprojects them (vectorised).
+    """
+
+    def __init__(self, map_widget, feed, fps=10, max_ops=1500, radius=4):
+        self.map_widget = map_widget
+        self.canvas = map_widget.canvas
+        self.feed = feed
+        self.interval_ms = int(1000 / fps)
+        self.max_ops = max_ops
+        self.radius = radius
+        self.markers = {}
+        self.deleted = False
+        self._view = None
+        # redessiné par le widget à chaque déplacement, comme ses chemins
+        map_widget.canvas_path_list.append(self)
+        self.map_widget.after(self.interval_ms, self._tick)
+
+    #methode pour convertir des positions en coordonnées du canvas
+    def _project(self, lat, lon):
+        widget = self.map_widget
+        n = 2.0 ** round(widget.zoom)
+        lat_rad = np.radians(lat)
+        tile_x = (np.asarray(lon) + 180.0) / 360.0 * n
+        tile_y = (1.0 - np.arcsinh(np.tan(lat_rad)) / np.pi) / 2.0 * n
+        (left, top), (right, bottom) = widget.upper_left_tile_pos, widget.lower_right_tile_pos
+        x = (tile_x - left) / (right - left) * widget.width
+        y = (tile_y - top) / (bottom - top) * widget.height
+        return x, y
+
+    def _tick(self):
+        if self.deleted:
+            return
+        try:
+            events = self.feed.take(self.max_ops)
+            if events:
+                self._apply(events)
+        finally:
+            # une erreur sur un lot n'arrête pas la couche
+            self.map_widget.after(self.interval_ms, self._tick)
+
+    def _apply(self, events):
+        shown = [event for event in events if event.get("op") != "remove"]
+        for event in events:
+            if event.get("op") == "remove":
+                item = self.markers.pop(event["id"], (None,))[0]
+                if item is not None:
+                    self.canvas.delete(item)
+        if not shown:
+            return
+        lat = np.fromiter((event["lat"] for event in shown), float, len(shown))
+        lon = np.fromiter((event["lon"] for event in shown), float, len(shown))
+        xs, ys = self._project(lat, lon)
+        r = self.radius
+        for event, x, y, la, lo in zip(shown, xs.tolist(), ys.tolist(), lat, lon):
+            key = event["id"]
+            marker = self.markers.get(key)
+            if marker is None:
+                color = KIND_COLORS.get(event.get("kind"), DEFAULT_COLOR)
+                item = self.canvas.create_oval(x - r, y - r, x + r, y + r, fill=color, outline="white",
+                                               width=1, tags=("traffic", "marker"))
+            else:
+                item = marker[0]
+                self.canvas.coords(item, x - r, y - r, x + r, y + r)
+            self.markers[key] = (item, la, lo)
+        self.canvas.lift("traffic")
+        self._view = self._current_view()
+
+    def _current_view(self):
+        widget = self.map_widget
+        return round(widget.zoom), tuple(widget.upper_left_tile_pos), tuple(widget.lower_right_tile_pos)
+
+    #methode appelée par TkinterMapView à chaque déplacement ou zoom de la carte
+    def draw(self, move=False):
+        if not self.markers:
+            return
+        view = self._current_view()
+        previous, self._view = self._view, view
+        if previous is not None and previous[0] == view[0] and previous[2][0] - previous[1][0] == view[2][0] - view[1][0]:
+            # simple déplacement : une seule opération pour tous les marqueurs
+            scale = self.map_widget.width / (view[2][0] - view[1][0])
+            dx = (previous[1][0] - view[1][0]) * scale
+            dy = (previous[1][1] - view[1][1]) * scale
+            self.canvas.move("traffic", dx, dy)
+            self.canvas.lift("traffic")
+            return
+        items = list(self.markers.values())
+        xs, ys = self._project(np.array([m[1] for m in items]), np.array([m[2] for m in items]))
+        r = self.radius
+        for (item, _, _), x, y in zip(items, xs.tolist(), ys.tolist()):
+            self.canvas.coords(item, x - r, y - r, x + r, y + r)
+        self.canvas.lift("traffic")
+
+    def delete(self):
+        self.deleted = True
+        self.feed.stop()
+        self.canvas.delete("traffic")
+        self.markers = {}
+        if self in self.map_widget.canvas_path_list:
+            self.map_widget.canvas_path_list.remove(self)
+
+
+#methode pour générer des événements de trafic synthétiques (incidents qui bougent puis disparaissent)
+def synthetic_events(markers=2000, seed=0):
+    from synthetic_data import _region_points
+    rng = np.random.default_rng(seed)
+    pool = np.vstack(list(_region_points(max(markers // 4, 50), rng).values()))
+    kinds = list(KIND_COLORS)
+    ids = []
+    positions = {}
+    next_id = 0
+    while True:
+        roll = rng.random()
+        if not ids or (roll < 0.2 and len(ids) < markers):
+            key = f"e{next_id}"
+            next_id += 1
+            lat, lon = pool[rng.integers(len(pool))]
+            ids.append(key)
+            positions[key] = (float(lat), float(lon))
+            yield {"id": key, "op": "add", "lat": positions[key][0], "lon": positions[key][1],
+                   "kind": kinds[rng.integers(len(kinds))]}
+        elif roll < 0.95:
+            key = ids[rng.integers(len(ids))]
+            lat, lon = positions[key]
+            positions[key] = (lat + float(rng.normal(0, 0.01)), lon + float(rng.normal(0, 0.01)))
+            yield {"id": key, "op": "move", "lat": positions[key][0], "lon": positions[key][1]}
+        else:
+            i = rng.integers(len(ids))
+            ids[i], ids[-1] = ids[-1], ids[i]
+            key = ids.pop()
+            del positions[key]
+            yield {"id": key, "op": "remove"}
+
+
+#methode pour servir un flux synthétique en TCP (JSON lines), en remplacement du flux réel
+async def serve(port=8765, rate=5000, markers=2000):
+    async def client(reader, writer):
+        events = synthetic_events(markers)
+        per_batch = max(rate // 100, 1)
+        try:
+            while True:
+                lines = "".join(json.dumps(next(events)) + "\n" for _ in range(per_batch))
+                writer.write(lines.encode())
+                await writer.drain()
+                await asyncio.sleep(per_batch / rate)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(client, "127.0.0.1", port)
+    print(f"Flux trafic synthétique sur tcp://127.0.0.1:{port} ({rate} événements/s)")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Flux trafic synthétique (banc d'essai de la couche trafic)")
+    parser.add_argument("kind", choices=["serve", "record"])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=int, default=5000, help="événements par seconde")
+    parser.add_argument("--markers", type=int, default=2000, help="incidents actifs au maximum")
+    parser.add_argument("--events", type=int, default=100_000, help="événements écrits (record)")
+    parser.add_argument("--out", default="traffic.jsonl", help="fichier JSONL (record)")
+    args = parser.parse_args()
+
+    if args.kind == "serve":
+        asyncio.run(serve(args.port, args.rate, args.markers))
+    else:
+        events = synthetic_events(args.markers)
+        with open(args.out, "w", encoding="utf-8") as out:
+            for _ in range(args.events):
+                out.write(json.dumps(next(events)) + "\n")
+        print(f"Écrit : {args.out}")
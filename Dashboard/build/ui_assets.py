@@ -0,0 +1,227 @@
+from pathlib import Path
+import argparse
+import json
+import os
+import tempfile
+
+base_dir = Path(__file__).parent
+assets_dir = base_dir / "assets" / "frame0"
+cache_dir = base_dir / "assets" / "cache"
+# cache de secours si le dossier de l'application n'est pas accessible en écriture
+fallback_cache_dir = Path(tempfile.gettempdir()) / "accidents_maroc_ui_cache"
+
+# A incrémenter si la composition change (le cache est alors reconstruit)
+ASSETS_VERSION = 1
+WINDOW_SIZE = (1920, 1080)
+BACKGROUND = "#110E43"
+
+# Couches fixes, dans l'ordre de dessin : (image, centre) ou ("text", position, texte, police, taille px)
+STATIC_LAYERS = [
+    ("image_1.png", (960.0, 44.0)),
+    ("text", (107.0, 28.0), "ETUDE DES ACCIDENTS DE ROUTE AU MAROC", "Inter SemiBold", 28),
+    ("image_17.png", (1649.0, 740.0)),
+    ("image_3.png", (1649.0, 256.0)),
+    ("image_4.png", (1029.0, 320.0)),
+    ("image_5.png", (343.0, 344.0)),
+    ("image_6.png", (703.0, 800.0)),
+    ("image_8.png", (243.0, 799.0)),
+    ("image_9.png", (702.0, 799.0)),
+    ("image_10.png", (1157.0, 799.0)),
+    ("image_11.png", (64.0, 39.0)),
+    ("image_14.png", (243, 799.0)),
+    ("image_16.png", (1168.0, 799.0)),
+]
+BUTTON_IMAGES = [f"button_{i}.png" for i in range(1, 9)]
+
+
+#methode pour retrouver un fichier sans tenir compte de la casse (Image_4.png / image_4.png)
+def _asset(name, directory=assets_dir):
+    path = directory / name
+    if path.exists():
+        return path
+    for candidate in directory.iterdir():
+        if candidate.name.lower() == name.lower():
+            return candidate
+    raise FileNotFoundError(path)
+
+
+def _sources(directory=assets_dir):
+    names = [layer[0] for layer in STATIC_LAYERS if layer[0] != "text"] + BUTTON_IMAGES
+    stamps = {}
+    for name in names:
+        stat = _asset(name, directory).stat()
+        stamps[name] = [stat.st_size, stat.st_mtime_ns]
+    return stamps
+
+
+#methode pour trouver le fichier d'une police installée (None si absente)
+def _font_file(family):
+    from matplotlib import font_manager
+    name, _, style = family.partition(" ")
+    weight = font_manager.weight_dict.get(style.lower(), 400) if style else 400
+    for entry in font_manager.fontManager.ttflist:
+        if entry.name == name and entry.weight == weight:
+            return entry.fname
+    return None
+
+
+def build(directory=assets_dir, out_dir=cache_dir, size=WINDOW_SIZE):
+    """Composite the static layers into background.png and pack the buttons into buttons.png.
+
+    The title is drawn into the background when its font is installed;
+    otherwise it is left out and the interface draws it as canvas text.
+    manifest.json records the atlas rectangles and the source stamps.
+    """
+    from PIL import Image, ImageDraw, ImageFont
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    background = Image.new("RGBA", size, BACKGROUND)
+    title_baked = True
+    for layer in STATIC_LAYERS:
+        if layer[0] == "text":
+            _, (x, y), text, family, pixels = layer
+            font_file = _font_file(family)
+            if font_file is None:
+                title_baked = False
+                continue
+            ImageDraw.Draw(background).text((x, y), text, fill="#FFFFFF", anchor="la",
+                                            font=ImageFont.truetype(font_file, pixels))
+            continue
+        name, (x, y) = layer
+        image = Image.open(_asset(name, directory)).convert("RGBA")
+        # même arrondi que Tk pour une image ancrée au centre
+        left = int(x + 0.5) - image.width // 2
+        top = int(y + 0.5) - image.height // 2
+        layer_image = Image.new("RGBA", size)
+        layer_image.paste(image, (left, top))
+        background = Image.alpha_composite(background, layer_image)
+    background.convert("RGB").save(out_dir / "background.png", optimize=True)
+
+    # boutons empilés verticalement dans une seule image
+    images = [Image.open(_asset(name, directory)).convert("RGBA") for name in BUTTON_IMAGES]
+    atlas = Image.new("RGBA", (max(image.width for image in images), sum(image.height for image in images)))
+    rects = {}
+    top = 0
+    for name, image in zip(BUTTON_IMAGES, images):
+        atlas.paste(image, (0, top))
+        rects[name] = [0, top, image.width, top + image.height]
+        top += image.height
+    atlas.save(out_dir / "buttons.png", optimize=True)
+
+    manifest = {
+        "version": ASSETS_VERSION,
+        "size": list(size),
+        "title_baked": title_baked,
+        "buttons": rects,
+        "sources": _sources(directory),
+    }
+    tmp = out_dir / "manifest.json.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, out_dir / "manifest.json")
+    return manifest
+
+
+#methode pour lire le manifeste d'un cache s'il est à jour (None sinon)
+def _cached_manifest(directory, out_dir, size):
+    try:
+        current = json.loads((out_dir / "manifest.json").read_text(encoding="utf-8"))
+        fresh = (current.get("version") == ASSETS_VERSION and current.get("size") == list(size)
+                 and current.get("sources") == _sources(directory)
+                 and (out_dir / "background.png").exists() and (out_dir / "buttons.png").exists())
+    except (OSError, ValueError):
+        return None
+    return current if fresh else None
+
+
+def manifest(directory=assets_dir, out_dir=cache_dir, size=WINDOW_SIZE):
+    """The cached composition's manifest, rebuilt first if missing or stale.
+
+    When out_dir cannot be written (read-only install) or the build fails,
+    a temporary cache directory is tried. manifest["cache_dir"] is where
+    the images were found; None means no composition could be built.
+    """
+    targets = [Path(out_dir), fallback_cache_dir]
+    for target in targets:
+        current = _cached_manifest(directory, target, size)
+        if current is not None:
+            current["cache_dir"] = str(target)
+            return current
+    print("Composition des images de l'interface (une seule fois)")
+    for target in targets:
+        try:
+            current = build(directory, target, size)
+        except (OSError, ImportError, ValueError) as e:
+            print(f"Composition impossible dans {target} : {e!r}")
+            continue
+        current["cache_dir"] = str(target)
+        return current
+    return None
+
+
+class Ui_assets:
+    """The composited background and the button atlas, decoded once each.
+
+    Without a composition (see manifest()), the source images are decoded
+    one by one instead: the background is composed in Tk and each button
+    keeps its own image.
+    """
+
+    def __init__(self, master, directory=assets_dir, out_dir=cache_dir):
+        from tkinter import PhotoImage
+
+        self.master = master
+        self.directory = directory
+        self.manifest = manifest(directory, out_dir)
+        self.buttons = {}
+        if self.manifest is None:
+            self.title_baked = False
+            self.atlas = None
+            self.background = self._compose(master)
+            return
+        out_dir = Path(self.manifest["cache_dir"])
+        self.title_baked = self.manifest["title_baked"]
+        self.background = PhotoImage(master=master, file=out_dir / "background.png")
+        self.atlas = PhotoImage(master=master, file=out_dir / "buttons.png")
+
+    #methode pour composer le fond directement dans Tk, couche par couche (mode de secours)
+    def _compose(self, master, size=WINDOW_SIZE):
+        from tkinter import PhotoImage
+
+        background = PhotoImage(master=master, width=size[0], height=size[1])
+        background.put(BACKGROUND, to=(0, 0, size[0], size[1]))
+        for layer in STATIC_LAYERS:
+            if layer[0] == "text":
+                continue
+            name, (x, y) = layer
+            image = PhotoImage(master=master, file=_asset(name, self.directory))
+            # même arrondi que build() ; la copie Tk mélange la transparence (règle overlay)
+            left = int(x + 0.5) - image.width() // 2
+            top = int(y + 0.5) - image.height() // 2
+            background.tk.call(background, "copy", image, "-from", max(-left, 0), max(-top, 0),
+                               image.width(), image.height(), "-to", max(left, 0), max(top, 0))
+        return background
+
+    def button(self, name):
+        """PhotoImage of one button, copied out of the atlas (no decode)."""
+        from tkinter import PhotoImage
+
+        image = self.buttons.get(name)
+        if image is None:
+            if self.atlas is None:
+                image = PhotoImage(master=self.master, file=_asset(name, self.directory))
+            else:
+                x0, y0, x1, y1 = self.manifest["buttons"][name]
+                image = PhotoImage(master=self.master, width=x1 - x0, height=y1 - y0)
+                image.tk.call(image, "copy", self.atlas, "-from", x0, y0, x1, y1, "-to", 0, 0)
+            self.buttons[name] = image
+        return image
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Composition du fond de l'interface et de l'atlas des boutons")
+    parser.add_argument("--assets", default=str(assets_dir), help="dossier des images sources")
+    parser.add_argument("--out", default=str(cache_dir), help="dossier du cache")
+    args = parser.parse_args()
+    result = build(Path(args.assets), Path(args.out))
+    print(f"Écrit : {args.out} (titre {'intégré' if result['title_baked'] else 'dessiné par Tk'})")
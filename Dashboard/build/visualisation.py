@@ -1,14 +1,47 @@
 from pathlib import Path
+import copy
+import unicodedata
 import pandas as pd
 import numpy as np
-from mpl_toolkits.mplot3d import Axes3D
-import sys
-import tkintermapview
-import geopandas as gpd
-import matplotlib.cm as cm
-import matplotlib.colors as mcolors
 import matplotlib.pyplot as plt
-from shapely.geometry import Point
+
+from sheet_store import Sheet_store
+from hover_legend import Legend_hover
+
+# Feuilles lues par chaque graphique (exports incrémentaux, rechargements)
+CHART_SHEETS = {
+    "plot_accidents_par_categorie": ["Accident_corporels"],
+    "plot_evolution_des_accidents": ["Evolution_accident_2008_2020"],
+    "plot_accidents_par_jours": ["ACCID_VICTIME_PAR_JOUR"],
+    "plot_victimes_par_categorie_usagers": ["VICTIME_PAR_CATEGORIE_DUSAGERS "],
+    "plot_victimes_par_localisation_et_gravite": ["Victimes_2016_2017"],
+    "plot_accidents_par_population": ["accid_popul_region"],
+    "plot_accidents_par_categorie_casa": ["ACCI_CASA"],
+    "plot_evolution_des_accidents_casa": ["CAUSE_ACC_CASA"],
+    "plot_accidents_par_jours_casa": ["LESROUTES_CASA"],
+    "plot_accidents_par_categorie_tng": ["Sheet1"],
+    "plot_accidents_par_cause_tng": ["Sheet2"],
+    "plot_accidents_par_villes_tng": ["Sheet7"],
+    "plot_accidents_par_categorie_dakhla": ["ACCID_AGLO_DAKHLA_OUED_EDDAHAB"],
+    "plot_3d_victimes_dakhla": ["ACCID_AGLO_DAKHLA_OUED_EDDAHAB"],
+    "plot_accidents_par_conditions_meteo_dakhla": ["ACCID_METEO_DAKHLA"],
+}
+
+
+# Régions mises en avant (panneaux détaillés), reconnues par le début de leur nom
+HIGHLIGHTED_REGIONS = ("casablanca", "tanger", "dakhla")
+
+
+#methode pour comparer des noms de région quelle que soit leur graphie (accents, majuscules)
+def _region_key(name):
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode()
+    return text.strip().lower()
+
+
+def charts_using(sheet_names):
+    """plot_* methods that read any of the given sheets."""
+    sheet_names = set(sheet_names)
+    return [name for name, sheets in CHART_SHEETS.items() if sheet_names & set(sheets)]
 
 
 class Visualisation_des_accidents:
@@ -17,14 +50,28 @@ class Visualisation_des_accidents:
         if not self.file_path.exists():
             raise FileNotFoundError(f"Fichier introuvable : {self.file_path}")
         print(f"Chemin du fichier Excel : {self.file_path}")
+        # Feuilles lues une seule fois et partagées par toutes les méthodes plot_*
+        self.sheets = Sheet_store(self.file_path)
         self.colors = [
         '#1f77b4', '#5da5da', '#2ca02c', '#d62728', '#9467bd', '#ffbb78',
         '#e377c2', 'orange', '#FF6500', '#6895D2', '#FF3C00', '#F9FFA5'
     ]
 
+    def chart_version(self, name):
+        """Version of the sheets a plot_* chart reads (the whole workbook if unknown)."""
+        if name in CHART_SHEETS:
+            return self.sheets.sheets_version(CHART_SHEETS[name])
+        return self.sheets.version()
+
+    def with_sheets(self, frames):
+        """Copy of the visualizer reading `frames` in place of the matching sheets."""
+        view = copy.copy(self)
+        view.sheets = copy.copy(self.sheets)
+        view.sheets.frames = {**self.sheets.frames, **frames}
+        return view
+
     def plot_accidents_par_categorie(self):
-        df = pd.read_excel(self.file_path, engine="openpyxl", sheet_name="Accident_corporels")
-        df = df[df['CATEGORIE'] != 'TOTAL']
+        df = self.sheets.get("Accident_corporels")
 
         categories = df["CATEGORIE"].tolist()
         values_outer = (df["MORTELS"] + df["N. MORTELS"]).tolist()
@@ -65,30 +112,25 @@ class Visualisation_des_accidents:
         )
         legend.set_visible(False)
         #effet hover pour afficher la legende
-        def on_hover(event):
-            if event.inaxes == ax:
-                legend.set_visible(True)
-            else:
-                legend.set_visible(False)
-            fig.canvas.draw_idle()
-
-        fig.canvas.mpl_connect("motion_notify_event", on_hover)
+        Legend_hover(fig, ax, legend)
 
         plt.title("Accidents par Catégorie et Sous-Catégorie", fontsize=10, color='white', loc='center', pad=1)
         plt.tight_layout()
         return fig
 
     def plot_evolution_des_accidents(self):
-        df = pd.read_excel(self.file_path, engine="openpyxl", sheet_name="Evolution_accident_2008_2020")
-        df_melted = df.melt(id_vars=["Unnamed: 0"], var_name="Year", value_name="Count")
-        df_melted.rename(columns={"Unnamed: 0": "Category"}, inplace=True)
-        df_melted['Year'] = pd.to_datetime(df_melted['Year'], format='%Y', errors='coerce')
-        df_melted.dropna(inplace=True)
-        pivot_df = df_melted.pivot(index='Year', columns='Category', values='Count').fillna(0)
+        df = self.sheets.get("Evolution_accident_2008_2020")
+        # colonnes années -> lignes, sans passer par melt puis pivot
+        years = pd.to_datetime(df.columns, format='%Y', errors='coerce')
+        table = df.loc[df["Unnamed: 0"].notna(), ~years.isna()]
+        pivot_df = pd.DataFrame(table.to_numpy().T, index=years[~years.isna()],
+                                columns=df.loc[table.index, "Unnamed: 0"])
+        pivot_df = pivot_df.sort_index().sort_index(axis=1).fillna(0)
 
         fig = plt.figure(figsize=(6, 5))
         plt.gcf().set_facecolor('#231E6D')
-        plt.gca().set_facecolor('#231E6D')
+        ax = plt.gca()
+        ax.set_facecolor('#231E6D')
 
         for column in pivot_df.columns:
             plt.fill_between(pivot_df.index, pivot_df[column], alpha=0.5, label=column)
@@ -111,28 +153,22 @@ class Visualisation_des_accidents:
         )
         legend.set_visible(False)
 
-        def on_hover(event):
-            if event.inaxes == plt.gca():
-                legend.set_visible(True)
-            else:
-                legend.set_visible(False)
-            fig.canvas.draw_idle()
-
-        fig.canvas.mpl_connect("motion_notify_event", on_hover)
+        Legend_hover(fig, ax, legend)
         
         return fig 
         
     def plot_accidents_par_jours(self):
-        df = pd.read_excel(self.file_path, engine="openpyxl", sheet_name="ACCID_VICTIME_PAR_JOUR")
-        df = df.drop(columns=["ACCID MORT", "ACCID N.MORT", "TUES", "BLES LEGER", "BLES GRAV"])
-        df.set_index('JOUR DE SEMAINE', inplace=True)
+        df = self.sheets.get("ACCID_VICTIME_PAR_JOUR")
+        # colonnes tracées lues directement dans la feuille partagée, sans copie
+        columns = df.columns.drop(["ACCID MORT", "ACCID N.MORT", "TUES", "BLES LEGER", "BLES GRAV", "JOUR DE SEMAINE"])
+        jours = df['JOUR DE SEMAINE']
 
         plt.figure(figsize=(9, 4))
         plt.gcf().set_facecolor('#231E6D')
         plt.gca().set_facecolor('#231E6D')
 
-        for column in df.columns:
-            plt.plot(df.index, df[column], marker='o', label=column, color='#ff7f0e')
+        for column in columns:
+            plt.plot(jours, df[column], marker='o', label=column, color='#ff7f0e')
 
         plt.title('Répartition des Accidents par Jour de la Semaine', fontsize=10, color='white')
         plt.xlabel('Jour de la Semaine', fontsize=8, color='white')
@@ -148,13 +184,14 @@ class Visualisation_des_accidents:
 
     def plot_victimes_par_categorie_usagers(self):
         
-        df = pd.read_excel(self.file_path, engine="openpyxl", sheet_name="VICTIME_PAR_CATEGORIE_DUSAGERS ")
+        df = self.sheets.get("VICTIME_PAR_CATEGORIE_DUSAGERS ")
         df = df.set_index("CATEGORIE DUSAGERS")
 
         
         fig = plt.figure(figsize=(6, 6))
         plt.gcf().set_facecolor('#231E6D')
-        plt.gca().set_facecolor('#231E6D')
+        ax = plt.gca()
+        ax.set_facecolor('#231E6D')
 
         # Paramètres des segments du graphique
         explode = [0.0, 0, 0.1, 0.0, 0.1, 0.0, 0.0, 0.1]
@@ -181,14 +218,7 @@ class Visualisation_des_accidents:
         )
         legend.set_visible(False)
 
-        def on_hover(event):
-            if event.inaxes == plt.gca():
-                legend.set_visible(True)
-            else:
-                legend.set_visible(False)
-            fig.canvas.draw_idle()
-
-        fig.canvas.mpl_connect("motion_notify_event", on_hover)
+        Legend_hover(fig, ax, legend)
         
 
         # Ajustement de la disposition
@@ -198,7 +228,7 @@ class Visualisation_des_accidents:
 
 
     def plot_victimes_par_localisation_et_gravite(self):
-        df = pd.read_excel(self.file_path, engine="openpyxl", sheet_name="Victimes_2016_2017")
+        df = self.sheets.get("Victimes_2016_2017")
 
         categories = ['TUES', 'BLESSES GRAVES', 'BLESSES LEGERS']
         locations = ['EN AGGLOMERATION', 'HORS AGGLOMERATION']
@@ -227,7 +257,8 @@ class Visualisation_des_accidents:
         
         fig = plt.figure(figsize=(6, 5))
         plt.gcf().set_facecolor('#231E6D')
-        plt.gca().set_facecolor('#231E6D')
+        ax = plt.gca()
+        ax.set_facecolor('#231E6D')
 
         
         wedges, texts, autotexts = plt.pie(
@@ -251,14 +282,7 @@ class Visualisation_des_accidents:
         )
         legend.set_visible(False)  
         
-        def on_hover(event):
-            if event.inaxes == plt.gca():
-                legend.set_visible(True) 
-            else:
-                legend.set_visible(False)  
-            fig.canvas.draw_idle()
-
-        fig.canvas.mpl_connect("motion_notify_event", on_hover)  
+        Legend_hover(fig, ax, legend)
 
         plt.tight_layout()
         return fig
@@ -266,21 +290,21 @@ class Visualisation_des_accidents:
         
 
     def plot_accidents_par_population(self):
-        df = pd.read_excel(self.file_path, engine="openpyxl", sheet_name="accid_popul_region")
-        df = df.iloc[:12, :].set_index('region')
-        df_sorted = df.sort_values(by='population', ascending=False)
+        df_sorted = self.sheets.get("accid_popul_region").sort_values(by='population', ascending=False)
+        regions = df_sorted['region']
 
         pop_sizes = [pop / 10000 for pop in df_sorted['population']]
-        colors=['red','#FFCC00','#FFCC00','#FFCC00','red','#FFCC00','#FFCC00','#FFCC00','#FFCC00','#FFCC00','#FFCC00','red']
+        # autant de couleurs que de régions (un extrait peut en compter plus que le classeur)
+        colors = ['red' if _region_key(region).startswith(HIGHLIGHTED_REGIONS) else '#FFCC00' for region in regions]
 
         plt.figure(figsize=(8, 4.7))
         plt.gcf().set_facecolor('#231E6D')
         plt.gca().set_facecolor('#231E6D')
 
-        for i, region in enumerate(df_sorted.index):
-            plt.scatter(i, df_sorted['accidents'][i], s=pop_sizes[i], color=colors[i], alpha=0.5, label=region)
+        for i, region in enumerate(regions):
+            plt.scatter(i, df_sorted['accidents'].iloc[i], s=pop_sizes[i], color=colors[i], alpha=0.5, label=region)
 
-        plt.xticks(ticks=range(len(df_sorted.index)), labels=df_sorted.index, fontsize=6, color='white', rotation=45)
+        plt.xticks(ticks=range(len(regions)), labels=regions, fontsize=6, color='white', rotation=45)
         plt.yticks(color='white',rotation=45)
         plt.xlabel('Régions', fontsize=12, color='white')
         plt.ylabel('Accidents', fontsize=12, color='white')
@@ -290,12 +314,8 @@ class Visualisation_des_accidents:
         return plt.gcf()
         
     def plot_accidents_par_categorie_casa(self):
-        data = pd.read_excel(self.file_path, sheet_name='ACCI_CASA')
-        data.columns = ['City', 'Total_Accidents']
-        data.dropna(inplace=True)
-        data['Total_Accidents'] = pd.to_numeric(data['Total_Accidents'], errors='coerce')
-        data.dropna(subset=['Total_Accidents'], inplace=True)
-        data.sort_values(by='Total_Accidents', ascending=False, inplace=True)
+        data = self.sheets.get('ACCI_CASA')
+        data = data.sort_values(by='Total_Accidents', ascending=False)
 
         plt.figure(figsize=(6, 6), facecolor='#231E6D')
         ax = plt.gca()
@@ -310,7 +330,7 @@ class Visualisation_des_accidents:
         return plt.gcf()
 
     def plot_evolution_des_accidents_casa(self):
-        data = pd.read_excel(self.file_path, sheet_name='CAUSE_ACC_CASA')
+        data = self.sheets.get('CAUSE_ACC_CASA')
         sizes = data['Pourcentage Approximatif (%)']
         labels = data['Cause des Accidents']
 
@@ -329,7 +349,8 @@ class Visualisation_des_accidents:
             wedgeprops={'linewidth': 1.2},
             textprops={'fontsize': 10, 'color': 'white'}
         )
-        plt.gca().set_facecolor('#231E6D')
+        ax = plt.gca()
+        ax.set_facecolor('#231E6D')
         plt.gcf().patch.set_facecolor('#231E6D')
 
         
@@ -342,30 +363,13 @@ class Visualisation_des_accidents:
         )
         legend.set_visible(False)  
 
-        def on_hover(event):
-            if event.inaxes == plt.gca():
-                legend.set_visible(True)  
-            else:
-                legend.set_visible(False)  
-            fig.canvas.draw_idle()
-
-        fig.canvas.mpl_connect("motion_notify_event", on_hover)  
+        Legend_hover(fig, ax, legend)
         plt.tight_layout()
         return plt.gcf()
 
 
     def plot_accidents_par_jours_casa(self):
-        data = pd.read_excel(self.file_path, sheet_name='LESROUTES_CASA', engine='openpyxl', skiprows=1)
-        data.columns = [
-            "Type_Reseau",
-            "Circulation",
-            "Accidents_Non_Mortels",
-            "Accidents_Mortels",
-        ]
-        data.dropna(inplace=True)
-        data = data[~data["Type_Reseau"].str.contains("TOTAL", na=False)]
-        for col in ["Circulation", "Accidents_Non_Mortels", "Accidents_Mortels"]:
-            data[col] = pd.to_numeric(data[col], errors='coerce')
+        data = self.sheets.get('LESROUTES_CASA')
 
         # Définition des couleurs
         colors = ['#cb3f69', '#00c89f', '#ffb652', '#0074D9', '#FF4136']  # Liste de couleurs
@@ -426,22 +430,14 @@ class Visualisation_des_accidents:
         legend=plt.legend(handles=legend_elements, title="Type de Réseau", loc="upper right", fontsize=8,facecolor='#384780', edgecolor='white', labelcolor='white')
         legend.set_visible(False)  
 
-        def on_hover(event):
-            if event.inaxes == plt.gca():  
-                legend.set_visible(True) 
-            else:
-                legend.set_visible(False)  
-            fig.canvas.draw_idle()
-
-        fig.canvas.mpl_connect("motion_notify_event", on_hover)  
+        Legend_hover(fig, (ax1, ax2), legend)
         
         plt.tight_layout()
         return fig
 
     
     def plot_accidents_par_categorie_tng(self):
-        sheet_name = 'Sheet1'
-        data = pd.read_excel(self.file_path, sheet_name=sheet_name)
+        data = self.sheets.get('Sheet1')
 
         # Trier les données par nombre de décès pour un affichage clair
         data = data.sort_values(by="Décès", ascending=True)
@@ -472,8 +468,7 @@ class Visualisation_des_accidents:
         return fig
 
     def plot_accidents_par_cause_tng(self):
-        sheet_name = 'Sheet2'
-        feuil2_data = pd.read_excel(self.file_path, sheet_name=sheet_name)
+        feuil2_data = self.sheets.get('Sheet2')
 
         sizes = feuil2_data["nbr acc"]
         aleend = feuil2_data["causes"]
@@ -503,28 +498,15 @@ class Visualisation_des_accidents:
             title_fontsize=12
         )
         legend.set_visible(False)  
-        def on_hover(event):
-            if event.inaxes == plt.gca():  
-                legend.set_visible(True)  
-            else:
-                legend.set_visible(False)  
-            fig.canvas.draw_idle()
-
-        fig.canvas.mpl_connect("motion_notify_event", on_hover) 
+        Legend_hover(fig, ax, legend)
 
         plt.title("Répartition des Accidents par Cause", fontsize=12, color='white',weight='bold')
         plt.tight_layout()
         return fig
 
     def plot_accidents_par_villes_tng(self):
-        sheet_name = 'Sheet7'
-        data = pd.read_excel(self.file_path, sheet_name=sheet_name)
-
-        data.columns = ['City', 'Accid_N_Mort', 'Accid_Mort', 'Total_Accidents']
-        data = data[['City', 'Total_Accidents']]
-        data.dropna(inplace=True)
-        data['Total_Accidents'] = pd.to_numeric(data['Total_Accidents'], errors='coerce')
-        data.sort_values(by='Total_Accidents', ascending=False, inplace=True)
+        data = self.sheets.get('Sheet7')
+        data = data.sort_values(by='Total_Accidents', ascending=False)
 
         fig, ax = plt.subplots(figsize=(5, 6))
         fig.patch.set_facecolor('#231E6D')
@@ -544,12 +526,11 @@ class Visualisation_des_accidents:
         return fig
 
     def plot_accidents_par_categorie_dakhla(self):
-        df = pd.read_excel(self.file_path, engine="openpyxl", sheet_name="ACCID_AGLO_DAKHLA_OUED_EDDAHAB")
-        df = df[df['CATEGORIE'] != 'TOTAL']
+        df = self.sheets.get("ACCID_AGLO_DAKHLA_OUED_EDDAHAB")
 
         total_accidents = df["ACCID N.MORT"].sum() + df["ACCID MORT"].sum()
-        df["Total_Cat"] = df["ACCID N.MORT"] + df["ACCID MORT"]
-        df["Percentage"] = (df["Total_Cat"] / total_accidents) * 100
+        total_cat = df["ACCID N.MORT"] + df["ACCID MORT"]
+        df = df.assign(Total_Cat=total_cat, Percentage=(total_cat / total_accidents) * 100)
 
         categories = df["CATEGORIE"].tolist()
         values_outer = df["Total_Cat"].tolist()
@@ -610,14 +591,7 @@ class Visualisation_des_accidents:
         
         legend.set_visible(False)  
 
-        def on_hover(event):
-            if event.inaxes == plt.gca(): 
-                legend.set_visible(True)  
-            else:
-                legend.set_visible(False)  
-            fig.canvas.draw_idle()
-
-        fig.canvas.mpl_connect("motion_notify_event", on_hover)  
+        Legend_hover(fig, ax, legend)
         
 
         plt.title("Accidents à Dakhla Ouad Eddahab \n (Catégorie et Sous-Catégorie)", fontsize=11, color='white',weight='bold')
@@ -625,8 +599,9 @@ class Visualisation_des_accidents:
         return fig
 
     def plot_3d_victimes_dakhla(self):
-        df = pd.read_excel(self.file_path, engine="openpyxl", sheet_name="ACCID_AGLO_DAKHLA_OUED_EDDAHAB")
-        df = df[df['CATEGORIE'] != 'TOTAL']
+        # mplot3d n'est chargé qu'au premier affichage du panneau 3D
+        from mpl_toolkits.mplot3d import Axes3D
+        df = self.sheets.get("ACCID_AGLO_DAKHLA_OUED_EDDAHAB")
 
         categories = df["CATEGORIE"].tolist()
         tues = df["TUES"].tolist()
@@ -660,14 +635,7 @@ class Visualisation_des_accidents:
         legend = ax.legend(title="Catégories", facecolor='#231E6D', edgecolor='white', fontsize=10, title_fontsize=12)
         legend.set_visible(False)  
 
-        def on_hover(event):
-            if event.inaxes == plt.gca():  
-                legend.set_visible(True) 
-            else:
-                legend.set_visible(False)  
-            fig.canvas.draw_idle()
-
-        fig.canvas.mpl_connect("motion_notify_event", on_hover)  
+        Legend_hover(fig, ax, legend)
         
         for text in legend.get_texts():
             text.set_color(text_color)
@@ -675,7 +643,7 @@ class Visualisation_des_accidents:
         return fig
 
     def plot_accidents_par_conditions_meteo_dakhla(self):
-        df = pd.read_excel(self.file_path, engine="openpyxl", sheet_name="ACCID_METEO_DAKHLA")
+        df = self.sheets.get("ACCID_METEO_DAKHLA")
 
         categories = df["Condition Météo"]
         accidents_totaux = df["Accidents Totaux"]
@@ -698,14 +666,7 @@ class Visualisation_des_accidents:
         legend = ax.legend(title="Gravité", loc="lower right", facecolor='#231E6D', edgecolor='white', labelcolor='white',)
         legend.set_visible(False)
 
-        def on_hover(event):
-            if event.inaxes == ax:
-                legend.set_visible(True)
-            else:
-                legend.set_visible(False)
-            fig.canvas.draw_idle()
-
-        fig.canvas.mpl_connect("motion_notify_event", on_hover)
+        Legend_hover(fig, ax, legend)
 
         plt.tight_layout()
         return fig
@@ -0,0 +1,54 @@
+import threading
+
+
+class Workbook_watcher:
+    """Polls the workbook and reloads its changed sheets off the Tk thread.
+
+    A change is acted upon once the file size and mtime are stable for one
+    interval (Excel writes in several steps). The changed sheets are parsed
+    in a thread (Sheet_store.read_changes()); the store is only updated on
+    the Tk thread, right before on_change(changed_sheets) is called.
+    """
+
+    def __init__(self, window, sheets, on_change, interval_ms=1000):
+        self.window = window
+        self.sheets = sheets
+        self.on_change = on_change
+        self.interval_ms = interval_ms
+        self._loaded = self._stat()
+        self._seen = self._loaded
+        self._thread = None
+        self._changes = None
+        window.after(interval_ms, self._poll)
+
+    def _stat(self):
+        try:
+            stat = self.sheets.file_path.stat()
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _poll(self):
+        if self._thread is None:
+            stat = self._stat()
+            if stat is not None and stat != self._loaded and stat == self._seen:
+                self._loaded = stat
+                self._thread = threading.Thread(target=self._reload, daemon=True)
+                self._thread.start()
+            self._seen = stat
+        elif not self._thread.is_alive():
+            self._thread = None
+            changes, self._changes = self._changes, None
+            # publication des nouvelles feuilles sur le thread Tk, entre deux rendus
+            changed = self.sheets.apply_changes(changes)
+            if changed:
+                self.on_change(changed)
+        self.window.after(self.interval_ms, self._poll)
+
+    def _reload(self):
+        try:
+            self._changes = self.sheets.read_changes()
+        except Exception as e:
+            # fichier en cours d'écriture : on réessaiera au prochain changement
+            print(f"Rechargement du classeur impossible : {e!r}")
+            self._changes = None